@@ -0,0 +1,243 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from src.bench.synthetic import generate
+from src.constants import *
+from src.data.individual import IndividualGrowth, IndividualLevel, read_survey
+from src.data.real import AbstractReal, RealMonthly, RealQuarterly
+from src.reg.fire import _PANELS, FireGrowth, FireLevel
+from src.reg.weight import Beta, WindowGenerator
+from src.settings import ProjectPath
+from src.utils.imports import *
+from src.utils.utils import _FILE_CACHE
+
+# Scales of the synthetic data relative to today's survey
+SCALES: tuple[int, ...] = (1, 10, 100)
+
+
+def cold() -> None:
+    """Forget every in-process and on-disk cache."""
+    _FILE_CACHE.clear()
+    _PANELS.clear()
+    shutil.rmtree(ProjectPath.cache, ignore_errors=True)
+
+
+def stage_load_survey(scale: int) -> Callable[[], Any]:
+    def run() -> Any:
+        cold()
+        return [
+            read_survey(column=column)
+            for column in ("Real GDP", "AAA Corporate Bond Rate")
+        ]
+
+    return run
+
+
+def stage_load_real(scale: int) -> Callable[[], Any]:
+    paths: list[str] = [
+        f"{ProjectPath.real}/{column}.csv"
+        for column in ("Real GDP", "Industry Production Index")
+    ]
+    return lambda: [AbstractReal.load(path=path) for path in paths]
+
+
+def stage_real_query(scale: int) -> Callable[[], Any]:
+    """`query_many` over every quarter, repeated `scale` times, plus the FIRE inputs."""
+    monthly = RealMonthly(column="Industry Production Index")
+    quarterly = RealQuarterly(column="Real GDP")
+    periods: np.ndarray = np.tile(monthly.quarters(end_offset=-4), scale)
+
+    def run() -> Any:
+        return (
+            monthly.query_many(periods=periods, kind="growth"),
+            quarterly.get_last_level(),
+            quarterly.get_actual_growth(),
+        )
+
+    return run
+
+
+def stage_individual_growth(scale: int) -> Callable[[], Any]:
+    read_survey(column="Real GDP")
+    return lambda: IndividualGrowth(column="Real GDP")
+
+
+def stage_individual_level(scale: int) -> Callable[[], Any]:
+    read_survey(column="AAA Corporate Bond Rate")
+    return lambda: IndividualLevel(column="AAA Corporate Bond Rate")
+
+
+def stage_fire_growth(scale: int) -> Callable[[], Any]:
+    FireGrowth(column="Real GDP")
+    return lambda: FireGrowth(column="Real GDP")
+
+
+def stage_fire_level(scale: int) -> Callable[[], Any]:
+    FireLevel(column="AAA Corporate Bond Rate")
+    return lambda: FireLevel(column="AAA Corporate Bond Rate")
+
+
+def stage_window_generator(scale: int) -> Callable[[], Any]:
+    df: DataFrame = FireGrowth(column="Real GDP").df
+    return lambda: sum(len(window.df) for window in WindowGenerator(df=df))
+
+
+def stage_beta(scale: int) -> Callable[[], Any]:
+    fire = FireGrowth(column="Real GDP")
+    return lambda: Beta(fire=fire)
+
+
+def stage_beta_streaming(scale: int) -> Callable[[], Any]:
+    fire = FireGrowth(column="Real GDP")
+    return lambda: Beta(fire=fire, streaming=True)
+
+
+# Stage name -> setup building the callable to measure (inputs are warm unless
+# the stage is about loading them)
+STAGES: dict[str, Callable[[int], Callable[[], Any]]] = {
+    "load.survey": stage_load_survey,
+    "load.real": stage_load_real,
+    "real.query": stage_real_query,
+    "individual.growth": stage_individual_growth,
+    "individual.level": stage_individual_level,
+    "fire.growth": stage_fire_growth,
+    "fire.level": stage_fire_level,
+    "window_generator": stage_window_generator,
+    "beta": stage_beta,
+    "beta.streaming": stage_beta_streaming,
+}
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Info:
+    """Wall time over `repeat` runs, then peak and retained memory of one traced run.
+
+    Memory is traced separately because `tracemalloc` slows the code down.
+    `retained_blocks` counts the allocations still alive when `func` returns
+    (its result included).
+    """
+    seconds: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result: Any = func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = after.compare_to(before, key_type="filename")
+    del result
+    return {
+        "seconds_min": min(seconds),
+        "seconds_median": float(np.median(seconds)),
+        "peak_bytes": peak,
+        "retained_bytes": sum(stat.size_diff for stat in retained),
+        "retained_blocks": sum(stat.count_diff for stat in retained),
+    }
+
+
+def commit() -> str:
+    """Short hash of the checked-out commit (`unknown` outside a git work tree)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(
+    scales: Sequence[int] = SCALES,
+    stages: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+    output: Optional[str] = None,
+) -> Info:
+    """Benchmark every stage on synthetic data at each scale and save JSON results.
+
+    Synthetic data are generated offline in a temporary directory, which is
+    the working directory while the stages run. Results go to `output`
+    (`benchmarks/{commit}.json` by default) for `compare`.
+    """
+    stages = list(STAGES) if stages is None else list(stages)
+    cwd: str = os.getcwd()
+    report: Info = {
+        "commit": commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": [],
+    }
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{scale}x_") as root:
+            generate(root=root, scale=scale)
+            os.chdir(root)
+            try:
+                cold()
+                for stage in progress(stages, description=f"Benchmark {scale}x"):
+                    report["results"].append(
+                        {"scale": scale, "stage": stage}
+                        | measure(func=STAGES[stage](scale), repeat=repeat)
+                    )
+            finally:
+                os.chdir(cwd)
+                cold()
+    output = (
+        f"{ProjectPath.bench}/{report['commit']}.json" if output is None else output
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    pp(pd.DataFrame(report["results"]).set_index(["scale", "stage"]))
+    return report
+
+
+def compare(baseline: str, current: str) -> DataFrame:
+    """Ratios current / baseline of the time and memory of every stage and scale."""
+    frames: list[DataFrame] = []
+    for path in (baseline, current):
+        with open(path) as file:
+            frames.append(
+                pd.DataFrame(json.load(file)["results"]).set_index(["scale", "stage"])
+            )
+    columns: list[str] = ["seconds_min", "peak_bytes"]
+    return (frames[1][columns] / frames[0][columns]).add_suffix("_ratio")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the data, FIRE and Beta stages."
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "CURRENT"), default=None
+    )
+    args = parser.parse_args()
+    if args.compare:
+        pp(compare(*args.compare))
+    else:
+        run_benchmarks(
+            scales=args.scales,
+            stages=args.stages,
+            repeat=args.repeat,
+            output=args.output,
+        )
@@ -0,0 +1,180 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from src.constants import *
+from src.settings import ProjectPath
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Variables generated, one per frequency / type of the real-time data
+SYNTHETIC: list[str] = [
+    "Real GDP",  # Q, level
+    "Industry Production Index",  # M, level
+    "Unemployment Rate",  # QM, rate
+    "AAA Corporate Bond Rate",  # MN, rate
+]
+# Forecasters in a survey at 1× (about the size of the SPF)
+FORECASTERS: int = 160
+
+
+def vintage_matrix(
+    rows: PeriodIndex, vintages: PeriodIndex, values: np.ndarray, noise: np.ndarray
+) -> DataFrame:
+    """Period × vintage matrix where a vintage holds the (revised) values before it."""
+    released: np.ndarray = (
+        rows.asfreq("M", how="start").asi8[:, None]
+        < vintages.asfreq("M", how="start").asi8[None, :]
+    )
+    df: DataFrame = pd.DataFrame(
+        np.where(released, values[:, None] + noise, np.nan),
+        index=rows.astype(str),
+        columns=vintages.astype(str),
+    )
+    return df.rename_axis("period").reset_index()
+
+
+def survey(
+    rng: np.random.Generator,
+    abbreviation: str,
+    anchor: Callable[[np.ndarray], np.ndarray],
+    forecasters: int,
+    drift: float,
+) -> DataFrame:
+    """SPF-shaped survey: forecasters answer a spell of rounds, skipping some.
+
+    `anchor` maps quarter ordinals to the value of quarter t - 1 known in t;
+    horizon `h` forecasts grow from it by `drift` per quarter (0 for rates,
+    whose forecasts are noise around the anchor).
+    """
+    rounds: np.ndarray = np.arange(
+        pd.Period("1968Q4").ordinal, pd.Period("2023Q4").ordinal + 1
+    )
+    start: np.ndarray = rng.integers(0, len(rounds) - 5, size=forecasters)
+    length: np.ndarray = np.minimum(
+        rng.integers(5, 90, size=forecasters), len(rounds) - start
+    )
+    ids: np.ndarray = np.repeat(np.arange(1, forecasters + 1), length)
+    position: np.ndarray = np.repeat(start - np.cumsum(length) + length, length)
+    period: np.ndarray = rounds[np.arange(len(ids)) + position]
+    # About one round in seven is skipped
+    answered: np.ndarray = rng.random(len(ids)) >= 0.15
+    ids, period = ids[answered], period[answered]
+    level: np.ndarray = anchor(period) * (1 + 0.002 * rng.standard_normal(len(ids)))
+    df: DataFrame = pd.DataFrame(
+        {"period": ordinals_to_period(period).astype(str), "id": ids}
+    )
+    for h in range(5):
+        df[f"{abbreviation}({h})"] = (
+            level
+            if h == 0
+            else level * np.exp(drift * h + 0.01 * rng.standard_normal(len(ids)))
+        )
+    return df.sort_values(by=["period", "id"], kind="stable")
+
+
+def generate(root: str, scale: int = 1, seed: int = SEED) -> None:
+    """Write raw survey, real-time and uncertainty files under `root`.
+
+    The surveys have `scale` × `FORECASTERS` forecasters (so about `scale`
+    times today's FIRE panels). The vintage matrices and uncertainty series
+    span the calendar of the real data and do not grow with `scale`.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed=seed)
+    raw: str = f"{root}/{ProjectPath.raw}"
+    for directory in ("Survey", "Real", "Uncertainty"):
+        os.makedirs(f"{raw}/{directory}", exist_ok=True)
+    forecasters: int = FORECASTERS * scale
+    quarters: PeriodIndex = pd.period_range("1947Q1", "2024Q1", freq="Q")
+    vintages: PeriodIndex = pd.period_range("1965Q4", "2024Q2", freq="Q")
+    months: PeriodIndex = pd.period_range("1919-01", "2024-03", freq="M")
+    monthly_vintages: PeriodIndex = pd.period_range("1962-11", "2024-04", freq="M")
+    # Real GDP: quarterly vintages of a quarterly level
+    gdp: np.ndarray = 100 * np.exp(
+        np.cumsum(0.008 + 0.01 * rng.standard_normal(len(quarters)))
+    )
+    vintage_matrix(
+        rows=quarters,
+        vintages=vintages,
+        values=gdp,
+        noise=0.3 * rng.standard_normal((len(quarters), len(vintages))),
+    ).to_csv(f"{raw}/Real/Real GDP.csv", index=False)
+    survey(
+        rng=rng,
+        abbreviation="RGDP",
+        anchor=lambda period: gdp[period - 1 - quarters[0].ordinal],
+        forecasters=forecasters,
+        drift=0.008,
+    ).to_csv(f"{raw}/Survey/Real GDP.csv", index=False)
+    # Industry Production Index: monthly vintages of a monthly level
+    ipt: np.ndarray = 50 * np.exp(
+        np.cumsum(0.002 + 0.01 * rng.standard_normal(len(months)))
+    )
+    vintage_matrix(
+        rows=months,
+        vintages=monthly_vintages,
+        values=ipt,
+        noise=0.1 * rng.standard_normal((len(months), len(monthly_vintages))),
+    ).to_csv(f"{raw}/Real/Industry Production Index.csv", index=False)
+    survey(
+        rng=rng,
+        abbreviation="IPT",
+        anchor=lambda period: ipt[last_month_ordinals(period - 1) - months[0].ordinal],
+        forecasters=forecasters,
+        drift=0.006,
+    ).to_csv(f"{raw}/Survey/Industry Production Index.csv", index=False)
+    # Unemployment Rate: quarterly vintages of a monthly rate
+    unemployment_months: PeriodIndex = pd.period_range("1948-01", "2024-03", freq="M")
+    unemployment: np.ndarray = 5 + np.cumsum(
+        0.1 * rng.standard_normal(len(unemployment_months))
+    )
+    vintage_matrix(
+        rows=unemployment_months,
+        vintages=vintages,
+        values=unemployment,
+        noise=0.05 * rng.standard_normal((len(unemployment_months), len(vintages))),
+    ).to_csv(f"{raw}/Real/Unemployment Rate.csv", index=False)
+    survey(
+        rng=rng,
+        abbreviation="Unemployment",
+        anchor=lambda period: np.full(len(period), 5.0),
+        forecasters=forecasters,
+        drift=0.0,
+    ).to_csv(f"{raw}/Survey/Unemployment Rate.csv", index=False)
+    # AAA Corporate Bond Rate: one monthly series
+    dates: DatetimeIndex = pd.date_range("1919-01-01", "2024-03-01", freq="MS")
+    pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "AAA": 6 + np.cumsum(0.05 * rng.standard_normal(len(dates))),
+        }
+    ).to_csv(f"{raw}/Real/AAA Corporate Bond Rate.csv", index=False)
+    survey(
+        rng=rng,
+        abbreviation="AAA",
+        anchor=lambda period: np.full(len(period), 6.0),
+        forecasters=forecasters,
+        drift=0.0,
+    ).to_csv(f"{raw}/Survey/AAA Corporate Bond Rate.csv", index=False)
+    # Uncertainty indices
+    dates = pd.date_range("1960-01-01", "2024-03-01", freq="MS")
+    pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "financial_uncertainty(1)": rng.random(len(dates)),
+            "real_uncertainty(1)": rng.random(len(dates)),
+            "macro_uncertainty(1)": rng.random(len(dates)),
+        }
+    ).to_csv(f"{raw}/Uncertainty/SCL.csv", index=False)
+    pd.DataFrame(
+        {"year": dates.year, "month": dates.month, "TIV": rng.random(len(dates))}
+    ).to_csv(f"{raw}/Uncertainty/TIV.csv", index=False)
+    dates = pd.date_range("1985-01-01", "2024-03-01", freq="MS")
+    pd.DataFrame(
+        {"date": dates.strftime("%Y-%m-%d"), "EPU": 100 + 50 * rng.random(len(dates))}
+    ).to_csv(f"{raw}/Uncertainty/EPU.csv", index=False)
+
+
+if __name__ == "__main__":
+    generate(root=sys.argv[1] if len(sys.argv) > 1 else "synthetic")
@@ -2,11 +2,9 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path.cwd()))
-from src.utils.imports import *
 
+# Seed for the random generators created where randomness is needed
 SEED: int = 0
-random.seed(a=SEED)
-np.random.seed(seed=SEED)
 
 WINDOW_SIZE: int = 80
 
@@ -7,10 +7,48 @@ sys.path.append(str(Path.cwd()))
 
 from src.constants import *
 from src.settings import ProjectPath
+from src.utils.cache import cached_frame
 from src.utils.imports import *
+from src.utils.instrument import stage
 from src.utils.utils import *
 
 
+def read_survey(column: str) -> DataFrame:
+    """Read the individual survey of `column` with `period` as int64 quarter ordinals."""
+    path: str = f"{ProjectPath.survey}/{column}.csv"
+
+    def load() -> DataFrame:
+        with stage("survey.parse", variable=column) as record:
+            df: DataFrame = pd.read_csv(filepath_or_buffer=path)
+            record.rows = len(df)
+        with stage("survey.periods", variable=column):
+            df["period"] = parse_periods(labels=df["period"]).asi8
+        return df
+
+    # Parsed once per process and shared (read-only) by every horizon
+    return cached_on_files(
+        key=f"survey:{path}",
+        paths=[path],
+        loader=lambda: cached_frame(
+            name=f"survey/{column}", source=path, loader=load, version=1
+        ),
+    )
+
+
+def previous_round(df: DataFrame, column: str) -> np.ndarray:
+    """`column` of the same forecaster in quarter t - 1 (NaN if they skipped it).
+
+    `df` must be sorted by `id` and `period`.
+    """
+    ordinals: np.ndarray = period_ordinals(df["period"])
+    ids: np.ndarray = df["id"].to_numpy()
+    consecutive: np.ndarray = np.r_[
+        False, (ids[1:] == ids[:-1]) & (np.diff(ordinals) == 1)
+    ]
+    values: np.ndarray = df[column].to_numpy(dtype=float)
+    return np.where(consecutive, np.r_[np.nan, values[:-1]], np.nan)
+
+
 @dataclass
 class IndividualGrowth:
     column: str
@@ -20,9 +58,7 @@ class IndividualGrowth:
         # Initialize the attributes
         self.column_name: str = VARIABLE[self.column]["abbreviation"]
         # Read the data
-        self.df: DataFrame = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.survey}/{self.column}.csv"
-        )
+        self.df: DataFrame = read_survey(column=self.column)
         # columns required
         if self.forecast_horizon > 1:
             self.columns: list[str] = [
@@ -38,8 +74,6 @@ class IndividualGrowth:
         else:
             raise ValueError("forecast horizon must be in range 1~4")
         self.df = self.df[["period", "id"] + self.columns]
-        # Convert the `period` to `Period` object
-        self.df["period"] = self.df["period"].map(arg=pd.Period)
         # F_t x_{t+3} (index: t)
         self.df_nowcast: DataFrame = (
             self.df[["period", "id", f"{self.column_name}({self.forecast_horizon-1})"]]
@@ -49,33 +83,22 @@ class IndividualGrowth:
             .dropna(subset="nowcast")
         )
         # (F_{t-1} x_{t+3}) / (F_{t-1} x_{t-1}) - 1 (index: t)
+        # The round of quarter t - 1 is relabelled to t, so gaps need no special care
+        df: DataFrame = self.df.sort_values(by=["id", "period"], kind="stable")
         self.df_forecast: DataFrame = (
-            (
-                self.df.set_index("period")
-                .groupby("id")[
-                    [
-                        f"{self.column_name}(0)",
-                        f"{self.column_name}({self.forecast_horizon})",
-                    ]
-                ]
-                .apply(func=lambda df: self.__shift_func(df=df))
-                .reset_index()
-            )[["forecast_period", "id", "forecast"]]
-            .rename(columns={"forecast_period": "period"})
+            pd.DataFrame(
+                {
+                    "period": df["period"] + 1,
+                    "id": df["id"],
+                    "forecast": df[f"{self.column_name}({self.forecast_horizon})"]
+                    / df[f"{self.column_name}(0)"]
+                    - 1,
+                }
+            )
             .dropna(subset="forecast")
+            .reset_index(drop=True)
         )
 
-    def __shift_func(self, df: DataFrame) -> DataFrame:
-        """Calculate the forecast for each individual series."""
-        df["forecast_period"] = df.index + 1
-        # pp(df)
-        df["forecast"] = (
-            df[f"{self.column_name}({self.forecast_horizon})"]
-            / df[f"{self.column_name}(0)"]
-            - 1
-        )
-        return df
-
 
 @dataclass
 class IndividualLevel:
@@ -85,20 +108,18 @@ class IndividualLevel:
         # Initialize the attributes
         self.column_name: str = VARIABLE[self.column]["abbreviation"]
         # Read the data
-        self.df: DataFrame = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.survey}/{self.column}.csv"
-        )
+        self.df: DataFrame = read_survey(column=self.column)
         # columns required
         self.columns: list[str] = [
             f"{self.column_name}(3)",
             f"{self.column_name}(4)",
         ]
-        self.df = self.df[["period", "id"] + self.columns]
+        self.df = self.df[["period", "id"] + self.columns].sort_values(
+            by=["id", "period"], kind="stable", ignore_index=True
+        )
         self.df.columns = ["period", "id", "nowcast", "forecast"]
-        # Convert the `period` to `Period` object
-        self.df["period"] = self.df["period"].map(pd.Period)
         # Revision: F_t x_{t+3} - F_{t-1} x_{t+3} (index: t)
-        self.df["forecast"] = self.df.groupby("id")["forecast"].shift(1)
+        self.df["forecast"] = previous_round(df=self.df, column="forecast")
         self.df["revision"] = self.df["nowcast"] - self.df["forecast"]
         self.df_revision: DataFrame = self.df[
             ["period", "id", "nowcast", "forecast", "revision"]
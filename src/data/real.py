@@ -7,11 +7,21 @@ sys.path.append(str(Path.cwd()))
 
 
 from src.constants import *
+from src.data.vintage import VintageStore, cached_store
 from src.settings import ProjectPath
+from src.utils.cache import cached_frame
 from src.utils.imports import *
+from src.utils.instrument import stage
 from src.utils.utils import *
 
 
+def mean_last_three(values: np.ndarray) -> np.ndarray:
+    """Mean over the last axis ignoring NaN (all-NaN rows stay NaN), like `Series.mean`."""
+    counts: np.ndarray = (~np.isnan(values)).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, np.nansum(values, axis=-1) / counts, np.nan)
+
+
 @dataclass
 class AbstractReal(ABC):
     column: str
@@ -19,26 +29,69 @@ class AbstractReal(ABC):
 
     def __post_init__(self) -> None:
         self.column_name: str = VARIABLE[self.column]["abbreviation"]
-        self.df: DataFrame = (
-            pd.read_csv(filepath_or_buffer=f"{ProjectPath.real}/{self.column}.csv")
-            .set_index(keys="period")
-            .fillna(value=np.nan)
-            .astype(dtype=float)
+        self.path: str = f"{ProjectPath.real}/{self.column}.csv"
+        # Compacted once per process and shared (read-only) by every horizon
+        self.store: VintageStore = cached_on_files(
+            key=f"AbstractReal:{self.path}",
+            paths=[self.path],
+            loader=lambda: cached_store(
+                name=f"vintage/{self.column}",
+                source=self.path,
+                loader=lambda: self.load(path=self.path),
+            ),
         )
-        self.df.index = self.df.index.map(mapper=pd.Period)
-        self.df.columns = self.df.columns.map(mapper=pd.Period)
+        # Integer period ordinals of the data (rows) and of the vintages (columns)
+        self.row_ordinals: np.ndarray = self.store.rows
+        self.column_ordinals: np.ndarray = self.store.vintages
         self.other_init()
 
+    @property
+    def df(self) -> DataFrame:
+        """Dense period × vintage matrix, rebuilt from `store` on every access."""
+        return self.store.to_frame()
+
+    @staticmethod
+    def load(path: str) -> DataFrame:
+        """Read the period × vintage matrix of real-time data."""
+        with stage("real.parse") as record:
+            df: DataFrame = (
+                pd.read_csv(filepath_or_buffer=path)
+                .set_index(keys="period")
+                .fillna(value=np.nan)
+                .astype(dtype=float)
+            )
+            record.rows = df.size
+        with stage("real.periods"):
+            df.index = parse_periods(labels=df.index).rename("period")
+            df.columns = parse_periods(labels=df.columns)
+        return df
+
     def other_init(self) -> None:
         """Other initialization steps."""
 
-    @abstractmethod
+    def take(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Values at (data period, vintage) ordinal pairs, NaN where either is absent."""
+        return self.store.take(rows=rows, vintages=columns)
+
+    def monthly_mean(self, months: np.ndarray, vintages: np.ndarray) -> np.ndarray:
+        """Average of the three months ending at `months` in the given vintages."""
+        return mean_last_three(
+            self.take(rows=months[:, None] - np.arange(3), columns=vintages[:, None])
+        )
+
     def query(
         self,
         data_period: Period | str,
         kind: str = "level",
     ) -> float:
-        """Query the data."""
+        """Query the data of a single quarter."""
+        return self.query_many(
+            periods=np.array([pd.Period(data_period, freq="Q").ordinal]), kind=kind
+        )[0]
+
+    @abstractmethod
+    def query_many(self, periods: np.ndarray, kind: str = "level") -> np.ndarray:
+        """Query the data of many quarters (int64 ordinals) at once, NaN where unavailable."""
 
     @abstractmethod
     def get_last_level(self) -> DataFrame:
@@ -67,122 +120,75 @@ class AbstractReal(ABC):
 
 class RealQuarterly(AbstractReal):
 
-    def other_init(self) -> None:
-        self.df_growth: DataFrame = (
-            self.df / self.df.shift(periods=self.forecast_horizon)  # 4
-        ) - 1
-        # pp(self.df_growth)
-
-    def query(
-        self,
-        data_period: Period | str,
-        kind: str = "level",
-    ) -> float:
+    def query_many(self, periods: np.ndarray, kind: str = "level") -> np.ndarray:
+        # Value of quarter `p` in the vintage released in quarter `p + 1`
         if kind == "level":
-            return self.df.loc[data_period].loc[data_period + 1]  # type: ignore
+            return self.take(rows=periods, columns=periods + 1)
         elif kind == "growth":
-            return self.df_growth.loc[data_period].loc[data_period + 1]  # type: ignore
+            return (
+                self.take(rows=periods, columns=periods + 1)
+                / self.take(rows=periods - self.forecast_horizon, columns=periods + 1)
+                - 1
+            )
         else:
             raise ValueError("kind must be 'level' or 'growth'")
 
     def get_last_level(self) -> DataFrame:
-        df = pd.DataFrame(index=sorted(list(set(self.df.index) & set(self.df.columns))))
-        df["last_level"] = df.index.map(
-            lambda x: self.query(
-                data_period=x,
-                kind="level",
-            )
-        )
+        df = pd.DataFrame(index=np.intersect1d(self.row_ordinals, self.column_ordinals))
+        df["last_level"] = self.query_many(periods=df.index.to_numpy(), kind="level")
         return df.shift(1).dropna()
 
     def get_actual_growth(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=[pd.Period(i) - self.forecast_horizon for i in self.df_growth.columns]
-        )
-        df["actual_growth"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + self.forecast_horizon - 1, kind="growth"
-            )
+        df = pd.DataFrame(index=self.column_ordinals - self.forecast_horizon)
+        df["actual_growth"] = self.query_many(
+            periods=df.index.to_numpy() + self.forecast_horizon - 1, kind="growth"
         )
         return df.dropna()
 
     def get_actual_level(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=[pd.Period(i) - self.forecast_horizon for i in self.df_growth.columns]
-        )  # 4
-        df["actual_level"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + self.forecast_horizon - 1, kind="level"
-            )  # 3
+        df = pd.DataFrame(index=self.column_ordinals - self.forecast_horizon)  # 4
+        df["actual_level"] = self.query_many(
+            periods=df.index.to_numpy() + self.forecast_horizon - 1, kind="level"  # 3
         )
         return df.dropna()
 
 
 class RealMonthly(AbstractReal):
 
-    def query(
-        self,
-        data_period: Period | str,
-        kind: str = "level",
-    ) -> float:
-        last_month: Period["M"] = data_period.asfreq("M")  # type: ignore
-        period_list: list[Period] = [last_month - i for i in range(3)]
-        if kind == "level":
-            return self.df.loc[period_list][last_month + 1].mean()  # type: ignore
+    def query_many(self, periods: np.ndarray, kind: str = "level") -> np.ndarray:
+        last_month: np.ndarray = last_month_ordinals(quarters=periods)
+        if kind in ("level", "next_level"):
+            return self.monthly_mean(months=last_month, vintages=last_month + 1)
         elif kind == "growth":
-            return (self.df.loc[period_list][last_month + 1].mean()) / (  # type: ignore
-                self.df.loc[[i - 12 for i in period_list]][last_month + 1].mean()  # type: ignore
-            ) - 1
-        elif kind == "next_level":
-            return self.df.loc[period_list][last_month + 1].mean()  # type: ignore
+            return (
+                self.monthly_mean(months=last_month, vintages=last_month + 1)
+                / self.monthly_mean(months=last_month - 12, vintages=last_month + 1)
+                - 1
+            )
         else:
             raise ValueError("kind must be 'level' or 'growth'")
 
+    def quarters(self, end_offset: int) -> np.ndarray:
+        """Quarters from the first vintage to `end_offset` quarters after the last."""
+        start, end = month_to_quarter(self.column_ordinals[[0, -1]])
+        return np.arange(start, end + end_offset + 1)
+
     def get_last_level(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.columns[0].asfreq("Q"),  # type: ignore
-                end=self.df.columns[-1].asfreq("Q") - 1,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["last_level"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x,
-                kind="level",
-            )
-        )
+        df = pd.DataFrame(index=self.quarters(end_offset=-1))
+        df["last_level"] = self.query_many(periods=df.index.to_numpy(), kind="level")
         return df.shift(periods=1).dropna()
 
     def get_actual_growth(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.columns[0].asfreq("Q"),  # type: ignore
-                end=self.df.columns[-1].asfreq("Q") - 4,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["actual_growth"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + 3,
-                kind="growth",
-            )
+        df = pd.DataFrame(index=self.quarters(end_offset=-4))
+        df["actual_growth"] = self.query_many(
+            periods=df.index.to_numpy() + 3, kind="growth"
         )
         return df.dropna()
 
     def get_actual_level(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.columns[0].asfreq("Q"),  # type: ignore
-                end=self.df.columns[-1].asfreq("Q") - 4,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["actual_level"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + 3,
-                kind="level",
-            )
+        df = pd.DataFrame(index=self.quarters(end_offset=-4))
+        df["actual_level"] = self.query_many(
+            periods=df.index.to_numpy() + 3, kind="level"
         )
         return df.dropna()
 
@@ -190,70 +196,44 @@ class RealMonthly(AbstractReal):
 class RealQuarterlyMonthly(AbstractReal):
 
     def other_init(self) -> None:
-        self.start_quarter: Period = self.df.columns[0]  # type:ignore
-
-    def query(self, data_period: Period, kind: str = "level"):
-        last_month: Period["M"] = data_period.asfreq("M")  # type: ignore
-        period_list: list[Period] = [last_month - i for i in range(3)]
-        current_period: Period = (
-            data_period + 1
-            if data_period + 1 >= self.start_quarter
-            else self.start_quarter
-        )
+        self.start_quarter: int = int(self.column_ordinals[0])
+
+    def query_many(self, periods: np.ndarray, kind: str = "level") -> np.ndarray:
+        last_month: np.ndarray = last_month_ordinals(quarters=periods)
+        # Vintage of the next quarter, or the first vintage if that is earlier
+        current_period: np.ndarray = np.maximum(periods + 1, self.start_quarter)
         if kind == "level":
-            return self.df.loc[period_list][current_period].mean()  # type: ignore
+            return self.monthly_mean(months=last_month, vintages=current_period)
         elif kind == "growth":
-            return (self.df.loc[period_list][current_period].mean()) / (  # type: ignore
-                self.df.loc[[i - 12 for i in period_list]][current_period].mean()  # type: ignore
-            ) - 1
+            return (
+                self.monthly_mean(months=last_month, vintages=current_period)
+                / self.monthly_mean(months=last_month - 12, vintages=current_period)
+                - 1
+            )
         else:
             raise ValueError("kind must be 'level' or 'growth'")
 
+    def quarters(self, start_offset: int, end_offset: int) -> np.ndarray:
+        """Quarters of the monthly data, shifted by the given offsets."""
+        start, end = month_to_quarter(self.row_ordinals[[0, -1]])
+        return np.arange(start + start_offset, end + end_offset + 1)
+
     def get_last_level(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.index[0].asfreq("Q"),  # type: ignore
-                end=self.df.index[-1].asfreq("Q") - 1,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["last_level"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x,
-                kind="level",
-            )
-        )
+        df = pd.DataFrame(index=self.quarters(start_offset=0, end_offset=-1))
+        df["last_level"] = self.query_many(periods=df.index.to_numpy(), kind="level")
         return df.shift(periods=1).dropna()
 
     def get_actual_growth(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.index[0].asfreq("Q") + 1,  # type: ignore
-                end=self.df.index[-1].asfreq("Q") - 4,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["actual_growth"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + 3,
-                kind="growth",
-            )
+        df = pd.DataFrame(index=self.quarters(start_offset=1, end_offset=-4))
+        df["actual_growth"] = self.query_many(
+            periods=df.index.to_numpy() + 3, kind="growth"
         )
         return df.dropna()
 
     def get_actual_level(self) -> DataFrame:
-        df = pd.DataFrame(
-            index=pd.period_range(
-                start=self.df.index[0].asfreq("Q") + 1,  # type: ignore
-                end=self.df.index[-1].asfreq("Q") - 4,  # type: ignore
-                freq="Q",
-            ),
-        )
-        df["actual_level"] = df.index.map(
-            mapper=lambda x: self.query(
-                data_period=x + 3,
-                kind="level",
-            )
+        df = pd.DataFrame(index=self.quarters(start_offset=1, end_offset=-4))
+        df["actual_level"] = self.query_many(
+            periods=df.index.to_numpy() + 3, kind="level"
         )
         return df.dropna()
 
@@ -264,12 +244,27 @@ class RealMonthlyNormal:
 
     def __post_init__(self) -> None:
         self.column_name: str = VARIABLE[self.column]["abbreviation"]
-        self.df = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.real}/{self.column}.csv"
-        )  # .set_index(keys="period")
-        self.df["date"] = pd.to_datetime(self.df["date"])
-        self.df["year"] = self.df["date"].dt.year
-        self.df["quarter"] = self.df["date"].dt.quarter
+        self.path: str = f"{ProjectPath.real}/{self.column}.csv"
+        # Parsed once per process and shared (read-only) by every horizon
+        self.df: DataFrame = cached_on_files(
+            key=f"{type(self).__name__}:{self.path}",
+            paths=[self.path],
+            loader=lambda: cached_frame(
+                name=f"real/{self.column}",
+                source=self.path,
+                loader=lambda: self.load(path=self.path),
+                version=1,
+            ),
+        )
+
+    @staticmethod
+    def load(path: str) -> DataFrame:
+        """Read the monthly series with the quarter ordinal of every date."""
+        with stage("real.parse") as record:
+            df: DataFrame = pd.read_csv(filepath_or_buffer=path)
+            record.rows = len(df)
+        df["period"] = date_quarters(dates=df.pop("date"))
+        return df
 
     def get_actual_level(self) -> DataFrame:
         """
@@ -277,22 +272,13 @@ class RealMonthlyNormal:
         index: t
         published time: t+4
         """
-        df: DataFrame = (
-            self.df.groupby(["year", "quarter"])[[self.column_name]]
-            .mean()
-            .rename(columns={self.column_name: "actual_level"})
-            .reset_index()
+        return quarterly_mean(
+            df=self.df[[self.column_name]].rename(
+                columns={self.column_name: "actual_level"}
+            ),
+            quarters=self.df["period"],
+            shift=-3,
         )
-        return (
-            df.set_index(
-                df.apply(
-                    lambda x: pd.Period(year=x["year"], quarter=x["quarter"], freq="Q"),
-                    axis=1,
-                )
-            )
-            .drop(columns=["year", "quarter"])
-            .shift(periods=-3)
-        ).dropna()
 
     def get_last_level(self) -> DataFrame:
         """
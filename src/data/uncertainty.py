@@ -5,7 +5,9 @@ sys.path.append(str(Path.cwd()))
 
 from src.constants import *
 from src.settings import ProjectPath
+from src.utils.cache import cached_frame
 from src.utils.imports import *
+from src.utils.instrument import stage
 from src.utils.utils import *
 
 
@@ -15,27 +17,26 @@ class SCL(object):
     window_size: int = 80
 
     def __post_init__(self):
-        self.df: DataFrame = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.uncertainty}/{self.column}.csv"
+        self.path: str = f"{ProjectPath.uncertainty}/{self.column}.csv"
+        # Parsed once per process and shared (read-only)
+        self.df: DataFrame = cached_on_files(
+            key=f"SCL:{self.path}",
+            paths=[self.path],
+            loader=lambda: cached_frame(
+                name=f"uncertainty/{self.column}",
+                source=self.path,
+                loader=lambda: self.load(path=self.path),
+                version=1,
+            ),
         )
-        self.df["date"] = pd.to_datetime(self.df["date"])
-        self.df["year"] = self.df["date"].dt.year
-        self.df["quarter"] = self.df["date"].dt.quarter
-        self.df = (
-            self.df.drop(columns="date")
-            .groupby(by=["year", "quarter"])
-            .mean()
-            .reset_index()
-        )
-        self.df["period"] = self.df[["year", "quarter"]].apply(
-            lambda row: pd.Period(year=row.iloc[0], quarter=row.iloc[1], freq="Q"),
-            axis=1,
+
+    @staticmethod
+    def load(path: str) -> DataFrame:
+        df: DataFrame = pd.read_csv(filepath_or_buffer=path)
+        # df = df.rolling(window=self.window_size).mean().dropna()
+        return quarterly_mean(
+            df=df.drop(columns="date"), quarters=date_quarters(dates=df["date"])
         )
-        self.df = self.df.drop(columns=["year", "quarter"]).set_index("period")
-        # self.df = self.df.rolling(window=self.window_size).mean().dropna()
-        # pp(self.df)
-        # self.df["real_uncertainty(1)"].plot()
-        # plt.show()
 
 
 @dataclass
@@ -43,13 +44,26 @@ class TIV(object):
     column: str = "TIV"
 
     def __post_init__(self):
-        self.df: DataFrame = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.uncertainty}/{self.column}.csv"
+        self.path: str = f"{ProjectPath.uncertainty}/{self.column}.csv"
+        self.df: DataFrame = cached_on_files(
+            key=f"TIV:{self.path}",
+            paths=[self.path],
+            loader=lambda: cached_frame(
+                name=f"uncertainty/{self.column}",
+                source=self.path,
+                loader=lambda: self.load(path=self.path),
+                version=1,
+            ),
         )
-        self.df["date"] = pd.to_datetime(self.df[["year", "month"]].assign(day=1))
-        self.df["period"] = self.df["date"].dt.to_period("Q")
-        self.df = (
-            self.df.drop(columns=["year", "month", "date"]).groupby("period").mean()
+
+    @staticmethod
+    def load(path: str) -> DataFrame:
+        df: DataFrame = pd.read_csv(filepath_or_buffer=path)
+        return quarterly_mean(
+            df=df.drop(columns=["year", "month"]),
+            quarters=month_to_quarter(
+                months=month_ordinals(year=df["year"], month=df["month"])
+            ),
         )
 
 
@@ -58,39 +72,57 @@ class EPU(object):
     column: str = "EPU"
 
     def __post_init__(self):
-        self.df: DataFrame = pd.read_csv(
-            filepath_or_buffer=f"{ProjectPath.uncertainty}/{self.column}.csv"
+        self.path: str = f"{ProjectPath.uncertainty}/{self.column}.csv"
+        self.df: DataFrame = cached_on_files(
+            key=f"EPU:{self.path}",
+            paths=[self.path],
+            loader=lambda: cached_frame(
+                name=f"uncertainty/{self.column}",
+                source=self.path,
+                loader=lambda: self.load(path=self.path),
+                version=1,
+            ),
         )
-        self.df["date"] = pd.to_datetime(self.df["date"])
-        self.df["year"] = self.df["date"].dt.year
-        self.df["quarter"] = self.df["date"].dt.quarter
-        self.df = (
-            self.df.drop(columns="date")
-            .groupby(by=["year", "quarter"])
-            .mean()
-            .reset_index()
-        )
-        self.df["period"] = self.df[["year", "quarter"]].apply(
-            lambda row: pd.Period(year=row.iloc[0], quarter=row.iloc[1], freq="Q"),
-            axis=1,
+
+    @staticmethod
+    def load(path: str) -> DataFrame:
+        df: DataFrame = pd.read_csv(filepath_or_buffer=path)
+        return (
+            quarterly_mean(
+                df=df.drop(columns="date"), quarters=date_quarters(dates=df["date"])
+            )
+            / 100
         )
-        self.df = self.df.drop(columns=["year", "quarter"]).set_index("period")
-        self.df = self.df / 100
-        # pp(self.df)
+
+
+def uncertainty_inputs() -> list[str]:
+    """Raw files `Uncertainty` is built from."""
+    return [f"{ProjectPath.uncertainty}/{column}.csv" for column in ("SCL", "EPU")]
 
 
 class Uncertainty(object):
+    """All uncertainty measures, merged on `period` (int64 quarter ordinals).
+
+    Every instance shares the same process-level frame, which is rebuilt only
+    when one of the raw files changes. Treat `df` as read-only.
+    """
+
     def __init__(self):
-        self.scl = SCL()
-        # self.tiv = TIV()
-        self.epu = EPU()
-        self.df = pd.merge(
-            left=self.scl.df,
-            right=self.epu.df,
-            left_index=True,
-            right_index=True,
-            how="outer",
-        )
+        with stage("uncertainty"):
+            self.scl = SCL()
+            # self.tiv = TIV()
+            self.epu = EPU()
+            self.df: DataFrame = cached_on_files(
+                key="Uncertainty",
+                paths=[self.scl.path, self.epu.path],
+                loader=lambda: pd.merge(
+                    left=self.scl.df,
+                    right=self.epu.df,
+                    left_index=True,
+                    right_index=True,
+                    how="outer",
+                ),
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from src.settings import ProjectPath
+from src.utils.cache import fingerprint
+from src.utils.imports import *
+
+# Ordinal of a missing period (pandas' NaT)
+NAT: int = np.iinfo(np.int64).min
+# Arrays of a store, saved as one `.npy` file each
+ARRAYS: tuple[str, ...] = ("data", "offsets", "start", "vintages")
+
+
+@dataclass
+class VintageStore(object):
+    """Ragged period × vintage matrix keeping only the observed band of each vintage.
+
+    Vintage `j` holds the consecutive periods `first + start[j]` up to
+    `first + start[j] + offsets[j + 1] - offsets[j] - 1`, whose values are
+    `data[offsets[j]:offsets[j + 1]]` (NaN only for gaps inside the band).
+    Rows are consecutive ordinals from `first`; `vintages` are sorted ordinals.
+    """
+
+    data: np.ndarray  # float64, observed band of every vintage back to back
+    offsets: np.ndarray  # int64, len(vintages) + 1
+    start: np.ndarray  # int64, first row of each vintage relative to `first`
+    vintages: np.ndarray  # int64 ordinals
+    first: int  # ordinal of the first row
+    length: int  # number of rows
+    row_freq: str
+    vintage_freq: str
+
+    @classmethod
+    def from_frame(cls, df: DataFrame) -> "VintageStore":
+        """Compact a dense period × vintage frame (`PeriodIndex` on both axes)."""
+        rows: np.ndarray = df.index.asi8
+        first: int = int(rows[0])
+        length: int = int(rows[-1]) - first + 1
+        # Dense matrix on consecutive rows (missing rows are NaN)
+        values: np.ndarray = np.full((length, df.shape[1]), np.nan)
+        values[rows - first] = df.to_numpy(dtype=float)
+        observed: np.ndarray = ~np.isnan(values)
+        any_observed: np.ndarray = observed.any(axis=0)
+        start: np.ndarray = np.where(any_observed, observed.argmax(axis=0), 0)
+        stop: np.ndarray = np.where(
+            any_observed, length - observed[::-1].argmax(axis=0), 0
+        )
+        # Row positions of the band of every vintage, column by column
+        sizes: np.ndarray = stop - start
+        offsets: np.ndarray = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        columns: np.ndarray = np.repeat(np.arange(len(sizes)), sizes)
+        positions: np.ndarray = (
+            np.arange(offsets[-1]) - offsets[columns] + start[columns]
+        )
+        return cls(
+            data=values[positions, columns],
+            offsets=offsets,
+            start=start.astype(np.int64),
+            vintages=df.columns.asi8.astype(np.int64),
+            first=first,
+            length=length,
+            row_freq=df.index.freqstr,
+            vintage_freq=df.columns.freqstr,
+        )
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Ordinals of the rows."""
+        return np.arange(self.first, self.first + self.length)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def take(self, rows: np.ndarray, vintages: np.ndarray) -> np.ndarray:
+        """Value of period `rows` in vintage `vintages` (ordinals), NaN where absent."""
+        rows, vintages = np.broadcast_arrays(
+            np.asarray(rows, dtype=np.int64), np.asarray(vintages, dtype=np.int64)
+        )
+        column: np.ndarray = np.clip(
+            np.searchsorted(self.vintages, vintages), 0, len(self.vintages) - 1
+        )
+        found: np.ndarray = self.vintages[column] == vintages
+        return self.band(rows=rows, column=column, found=found)
+
+    def as_of(self, rows: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        """Value of period `rows` in the latest vintage released by `dates`."""
+        rows, dates = np.broadcast_arrays(
+            np.asarray(rows, dtype=np.int64), np.asarray(dates, dtype=np.int64)
+        )
+        column: np.ndarray = np.searchsorted(self.vintages, dates, side="right") - 1
+        return self.band(rows=rows, column=np.maximum(column, 0), found=column >= 0)
+
+    def latest(self, dates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Last observed period (`NAT` if none) and its value as of `dates`."""
+        dates = np.asarray(dates, dtype=np.int64)
+        column: np.ndarray = np.searchsorted(self.vintages, dates, side="right") - 1
+        safe: np.ndarray = np.maximum(column, 0)
+        size: np.ndarray = self.offsets[safe + 1] - self.offsets[safe]
+        found: np.ndarray = (column >= 0) & (size > 0)
+        periods: np.ndarray = np.where(
+            found, self.first + self.start[safe] + size - 1, NAT
+        )
+        return periods, self.band(rows=periods, column=safe, found=found)
+
+    def band(
+        self, rows: np.ndarray, column: np.ndarray, found: np.ndarray
+    ) -> np.ndarray:
+        """Values of `rows` in the vintages at positions `column` where `found`."""
+        position: np.ndarray = rows - self.first - self.start[column]
+        size: np.ndarray = self.offsets[column + 1] - self.offsets[column]
+        found = found & (position >= 0) & (position < size)
+        index: np.ndarray = np.where(found, self.offsets[column] + position, 0)
+        if not len(self.data):
+            return np.full(rows.shape, np.nan)
+        return np.where(found, self.data[index], np.nan)
+
+    def to_frame(self) -> DataFrame:
+        """Dense period × vintage frame (as read from the CSV)."""
+        rows: np.ndarray = self.rows
+        columns: np.ndarray = np.arange(len(self.vintages))
+        return pd.DataFrame(
+            self.take(rows=rows[:, None], vintages=self.vintages[None, columns]),
+            index=pd.PeriodIndex.from_ordinals(rows, freq=self.row_freq).rename(
+                "period"
+            ),
+            columns=pd.PeriodIndex.from_ordinals(self.vintages, freq=self.vintage_freq),
+        )
+
+    def save(self, path: str, meta: Optional[Info] = None) -> None:
+        """Write one `.npy` file per array in directory `path` and `path.json`."""
+        os.makedirs(path, exist_ok=True)
+        # Write to temporary files first so concurrent readers never see a partial store
+        for name in ARRAYS:
+            temporary: str = f"{path}/{name}.{os.getpid()}.tmp.npy"
+            np.save(temporary, getattr(self, name))
+            os.replace(temporary, f"{path}/{name}.npy")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(
+                {
+                    "first": self.first,
+                    "length": self.length,
+                    "row_freq": self.row_freq,
+                    "vintage_freq": self.vintage_freq,
+                }
+                | (meta or {}),
+                file,
+            )
+        os.replace(temporary, f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "VintageStore":
+        """Read a store written by `save`, memory-mapping its arrays by default."""
+        with open(f"{path}.json") as file:
+            meta: Info = json.load(file)
+        return cls(
+            **{
+                name: np.load(f"{path}/{name}.npy", mmap_mode=mmap_mode)
+                for name in ARRAYS
+            },
+            first=meta["first"],
+            length=meta["length"],
+            row_freq=meta["row_freq"],
+            vintage_freq=meta["vintage_freq"],
+        )
+
+
+def cached_store(
+    name: str,
+    source: str,
+    loader: Callable[[], DataFrame],
+    version: int = 0,
+) -> VintageStore:
+    """Compact the vintage matrix built by `loader` through `cache/{name}`.
+
+    Like `cached_frame`: the store is saved as memory-mappable `.npy` files with
+    the SHA-256 of `source`, and rebuilt when the source or `version` changes.
+    """
+    path: str = f"{ProjectPath.cache}/{name}"
+    digest: str = fingerprint(sources=[source])
+    if os.path.exists(f"{path}.json") and all(
+        os.path.exists(f"{path}/{array}.npy") for array in ARRAYS
+    ):
+        with open(f"{path}.json") as file:
+            meta: Info = json.load(file)
+        if meta.get("sha256") == digest and meta.get("version", 0) == version:
+            return VintageStore.load(path=path)
+    store: VintageStore = VintageStore.from_frame(df=loader())
+    store.save(path=path, meta={"source": source, "sha256": digest, "version": version})
+    return store
+
+
+if __name__ == "__main__":
+    from src.data.real import AbstractReal
+
+    df: DataFrame = AbstractReal.load(path=f"{ProjectPath.real}/Real GDP.csv")
+    store = VintageStore.from_frame(df=df)
+    pp(f"Dense: {df.to_numpy().nbytes:,} bytes, compact: {store.nbytes:,} bytes")
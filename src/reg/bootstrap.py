@@ -0,0 +1,217 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import warnings
+from functools import partial
+
+from src.constants import *
+from src.reg.fire import Fire
+from src.reg.rolling import (
+    LEVELS,
+    MOMENTS,
+    PeriodMoments,
+    id_moments,
+    level_moments,
+    ols_slope,
+    quarter_sums,
+    weight_on_idiosyncratic,
+    window_beta,
+)
+from src.settings import ProjectPath
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Series with confidence bands
+SERIES: list[str] = list(LEVELS) + ["weight"]
+
+
+def block_counts(
+    rng: np.random.Generator, replicates: int, window_size: int, block_size: int
+) -> np.ndarray:
+    """How often every quarter of a window is drawn by a moving-block bootstrap.
+
+    Each replicate concatenates blocks of `block_size` consecutive quarters
+    with uniform starting points until the window is filled. Returns a
+    (replicates, window_size) count matrix.
+    """
+    block_size = min(block_size, window_size)
+    blocks: int = -(-window_size // block_size)
+    starts: np.ndarray = rng.integers(
+        0, window_size - block_size + 1, size=(replicates, blocks)
+    )
+    drawn: np.ndarray = (starts[:, :, None] + np.arange(block_size)).reshape(
+        replicates, -1
+    )[:, :window_size]
+    offset: np.ndarray = np.arange(replicates)[:, None] * window_size
+    return np.bincount(
+        (drawn + offset).ravel(), minlength=replicates * window_size
+    ).reshape(replicates, window_size)
+
+
+def cluster_counts(rng: np.random.Generator, replicates: int, ids: int) -> np.ndarray:
+    """How often every forecaster is drawn when resampling `ids` forecasters."""
+    if ids == 0:
+        return np.zeros((replicates, 0), dtype=np.int64)
+    drawn: np.ndarray = rng.integers(0, ids, size=(replicates, ids))
+    offset: np.ndarray = np.arange(replicates)[:, None] * ids
+    return np.bincount((drawn + offset).ravel(), minlength=replicates * ids).reshape(
+        replicates, ids
+    )
+
+
+def bootstrap_beta(
+    df: DataFrame,
+    window_size: int = WINDOW_SIZE,
+    replicates: int = 1000,
+    block_size: int = 4,
+    cluster: Optional[Literal["id"]] = None,
+    alpha: float = 0.05,
+    seed: int = SEED,
+) -> DataFrame:
+    """Block-bootstrap confidence bands of the rolling coefficients and weight.
+
+    Every replicate resamples the quarters of a window in blocks of
+    `block_size`, jointly for the three levels so that the weight keeps their
+    correlation. With `cluster="id"` the forecasters active in the window are
+    resampled as well: the individual moments of every quarter are the
+    count-weighted sums of its per-forecaster moments, and the consensus and
+    idiosyncratic moments of the replicate follow from them (and from its
+    quarter means) as in `level_moments`, so all three levels and the weight
+    come from the same resampled panel. Windows without active forecasters
+    have no replicates. Replicates are never materialized as panels: the
+    resampled moment sums of a window are count-weighted sums of its
+    per-period (or per-forecaster) moments, so all replicates of a window are
+    solved as one batched least-squares.
+
+    Returns the point estimates of `consensus`, `individual`, `idiosyncratic`
+    and `weight` with `{series}_lower`/`{series}_upper` percentile bands at
+    level `1 - alpha`, indexed by window as in `rolling_beta` (int64 quarter
+    ordinals).
+    """
+    rng: np.random.Generator = np.random.default_rng(seed=seed)
+    moments: dict[str, PeriodMoments] = level_moments(df=df)
+    df_band: DataFrame = window_beta(moments=moments, window_size=window_size)
+    df_band["weight"] = weight_on_idiosyncratic(df_beta=df_band)
+    # (periods, levels, 6)
+    stacked: np.ndarray = np.stack([moments[level].sums for level in LEVELS], axis=1)
+    # (ids, periods, 6), in the centering of the individual moments
+    by_period: Optional[np.ndarray] = (
+        id_moments(df=df, level="individual", moments=moments["individual"])
+        if cluster == "id"
+        else None
+    )
+    draws: np.ndarray = np.full((len(df_band), replicates, len(SERIES)), np.nan)
+    for i in range(len(df_band)):
+        window: slice = slice(i, i + window_size)
+        counts: np.ndarray = block_counts(
+            rng=rng,
+            replicates=replicates,
+            window_size=window_size,
+            block_size=block_size,
+        )
+        if by_period is None:
+            # (replicates, window) @ (window, levels × 6)
+            sums: np.ndarray = (
+                counts @ stacked[window].reshape(window_size, -1)
+            ).reshape(replicates, len(LEVELS), len(MOMENTS))
+        else:
+            # Forecasters active in the window
+            by_id: np.ndarray = by_period[:, window]
+            by_id = by_id[by_id[:, :, 0].sum(axis=1) > 0]
+            if not len(by_id):
+                continue
+            weights: np.ndarray = cluster_counts(
+                rng=rng, replicates=replicates, ids=len(by_id)
+            )
+            # Σ_id w[b, id] m[id, t] → individual moments (replicates, window, 6)
+            individual: np.ndarray = (weights @ by_id.reshape(len(by_id), -1)).reshape(
+                replicates, window_size, len(MOMENTS)
+            )
+            consensus, idiosyncratic = quarter_sums(
+                sums=individual, consensus_shift=(0.0, 0.0)
+            )
+            # Then Σ_t c[b, t] for every level
+            sums = np.einsum(
+                "bt,btlk->blk",
+                counts,
+                np.stack([consensus, individual, idiosyncratic], axis=2),
+            )
+        beta: np.ndarray = ols_slope(sums)
+        draws[i, :, :3] = beta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            draws[i, :, 3] = (beta[:, 1] - beta[:, 0]) / (beta[:, 2] - beta[:, 0])
+    draws[~np.isfinite(draws)] = np.nan
+    with warnings.catch_warnings():
+        # Windows whose replicates are all degenerate stay NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        lower, upper = np.nanquantile(draws, q=[alpha / 2, 1 - alpha / 2], axis=1)
+    for j, series in enumerate(SERIES):
+        df_band[f"{series}_lower"] = lower[:, j]
+        df_band[f"{series}_upper"] = upper[:, j]
+    return df_band
+
+
+def bootstrap_variable(
+    column: str,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    replicates: int = 1000,
+    block_size: int = 4,
+    cluster: Optional[Literal["id"]] = None,
+    save: bool = True,
+) -> DataFrame:
+    """Confidence bands of one variable, saved next to its beta CSV."""
+    fire = Fire(column=column, forecast_horizon=forecast_horizon, cache=True)
+    df_band: DataFrame = bootstrap_beta(
+        df=fire.df,
+        window_size=window_size,
+        replicates=replicates,
+        block_size=block_size,
+        cluster=cluster,
+    )
+    df_band.index = ordinals_to_period(df_band.index).rename("period")
+    if save:
+        os.makedirs(ProjectPath.bootstrap_reg, exist_ok=True)
+        df_band.to_csv(
+            path_or_buf=f"{ProjectPath.bootstrap_reg}/{fire.name}.csv", index=True
+        )
+    return df_band
+
+
+def bootstrap(
+    variables: Optional[Sequence[str]] = None,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    replicates: int = 1000,
+    block_size: int = 4,
+    cluster: Optional[Literal["id"]] = None,
+    workers: Optional[int] = None,
+    save: bool = True,
+) -> dict[str, DataFrame]:
+    """Bootstrap bands of every variable, spread across `workers` processes.
+
+    Every variable draws from its own generator seeded with `SEED`, so the
+    bands do not depend on the number of workers.
+    """
+    variables = list(VARIABLE) if variables is None else list(variables)
+    results: list[DataFrame] = parallel_map(
+        func=partial(
+            bootstrap_variable,
+            forecast_horizon=forecast_horizon,
+            window_size=window_size,
+            replicates=replicates,
+            block_size=block_size,
+            cluster=cluster,
+            save=save,
+        ),
+        items=variables,
+        workers=workers,
+        description="Bootstrap",
+    )
+    return dict(zip(variables, results))
+
+
+if __name__ == "__main__":
+    bootstrap()
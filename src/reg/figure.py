@@ -0,0 +1,226 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from dataclasses import asdict, field
+
+import matplotlib
+
+# Render off-screen: figures are written to files, from worker processes too
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from src.constants import *
+from src.reg.regime import panel_regimes
+from src.reg.rolling import LEVELS
+from src.settings import ProjectPath
+from src.utils.cache import fingerprint
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Bump whenever a renderer changes what it draws, to redraw every figure
+FIGURE_VERSION: int = 0
+# Two-sided normal quantile of the bands around the rolling coefficients
+BAND_QUANTILE: float = 1.96
+
+
+@dataclass
+class FigureJob(object):
+    """One figure drawn by the renderer `kind` from the CSV files `sources`."""
+
+    kind: str  # key of `RENDERERS`
+    path: str  # output image
+    sources: list[str]
+    options: Info = field(default_factory=dict)
+
+    def meta(self) -> Info:
+        """What the figure is drawn from, saved next to it as `{path}.json`."""
+        return asdict(self) | {
+            "sha256": fingerprint(sources=self.sources),
+            "version": FIGURE_VERSION,
+        }
+
+    def fresh(self, meta: Info) -> bool:
+        """Whether the saved figure was drawn from the same inputs as `meta`."""
+        if not (os.path.exists(self.path) and os.path.exists(f"{self.path}.json")):
+            return False
+        with open(f"{self.path}.json") as file:
+            return json.load(file) == meta
+
+    def render(self, meta: Info) -> str:
+        """Draw and save the figure, then record `meta` beside it."""
+        fig = RENDERERS[self.kind](sources=self.sources, **self.options)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to temporary files first so a failed run never leaves a partial figure
+        root, extension = os.path.splitext(self.path)
+        temporary: str = f"{root}.{os.getpid()}.tmp{extension}"
+        fig.savefig(temporary, dpi=150)
+        plt.close(fig)
+        os.replace(temporary, self.path)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(meta, file)
+        os.replace(temporary, f"{self.path}.json")
+        return self.path
+
+
+def rolling_figure(sources: list[str], title: str) -> plt.Figure:
+    """Rolling coefficients of the three levels and the weight, from a beta CSV.
+
+    Coefficients are drawn with their HAC confidence bands when the CSV
+    holds the standard errors.
+    """
+    df: DataFrame = pd.read_csv(sources[0], index_col="period")
+    dates: DatetimeIndex = parse_periods(df.index).to_timestamp(how="end")
+    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(14, 10), sharex=True)
+    for ax, level in zip(axes.flat, LEVELS):
+        ax.plot(dates, df[level], color="#000000")
+        if f"{level}_hac_se" in df:
+            ax.fill_between(
+                dates,
+                df[level] - BAND_QUANTILE * df[f"{level}_hac_se"],
+                df[level] + BAND_QUANTILE * df[f"{level}_hac_se"],
+                color="#808080",
+                alpha=0.3,
+                linewidth=0,
+            )
+        ax.axhline(0, color="#808080", linewidth=0.8)
+        ax.set_title(f"{level.capitalize()} Coefficients")
+        ax.set_ylabel("Coefficients")
+    axes[1, 1].plot(dates, df["weight"] * 100, color="#000000")
+    axes[1, 1].set_title("Weights on Idiosyncratic")
+    axes[1, 1].set_ylabel("Weights(%)")
+    for ax in axes.flat:
+        ax.grid(True, linestyle="--", alpha=0.6)
+    fig.suptitle(title)
+    fig.tight_layout()
+    return fig
+
+
+def regime_figure(
+    sources: list[str], labels: list[str], breaks: list[str]
+) -> plt.Figure:
+    """Coefficients and weights of every regime between `breaks`, one group of bars per panel CSV."""
+    df: DataFrame = pd.concat(
+        [
+            panel_regimes(
+                df=pd.read_csv(source, usecols=["period", "revision", "error"]),
+                breaks=breaks,
+            ).assign(variable=label)
+            for source, label in zip(sources, labels)
+        ]
+    ).reset_index()
+    regimes: list[str] = list(dict.fromkeys(df["regime"]))
+    width: float = 0.7 / len(regimes)
+    index: np.ndarray = np.arange(len(labels))
+    # Shades of grey from black, one per regime
+    colors: list[str] = [f"{shade:.2f}" for shade in np.linspace(0, 0.6, len(regimes))]
+    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(14, 12))
+    for ax, series in zip(axes.flat, [*LEVELS, "weight"]):
+        scale: int = 100 if series == "weight" else 1
+        for i, regime in enumerate(regimes):
+            values: Series = df[df["regime"] == regime].set_index("variable")[series]
+            ax.bar(
+                index + (i - (len(regimes) - 1) / 2) * width,
+                scale * values.reindex(labels).to_numpy(),
+                width,
+                label=regime,
+                color=colors[i],
+            )
+        ax.set_title(
+            "Weights on Idiosyncratic"
+            if series == "weight"
+            else f"{series.capitalize()} Coefficients"
+        )
+        ax.set_ylabel("Weights(%)" if series == "weight" else "Coefficients")
+        ax.set_xticks(index)
+        ax.set_xticklabels(labels, rotation=45)
+        ax.grid(True, linestyle="--", alpha=0.6)
+    fig.legend(
+        regimes,
+        loc="lower center",
+        ncol=len(regimes),
+        frameon=False,
+        fontsize="large",
+    )
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.14, top=0.95)
+    return fig
+
+
+RENDERERS: dict[str, Callable[..., plt.Figure]] = {
+    "rolling": rolling_figure,
+    "regime": regime_figure,
+}
+
+
+def figure_jobs(
+    variables: Optional[Sequence[str]] = None,
+    breaks: Sequence[str] = ("2000Q1",),
+    extension: str = "png",
+) -> list[FigureJob]:
+    """The rolling figure of every variable and the regime chart across them.
+
+    Without `variables`, every variable whose derived CSVs exist is drawn.
+    """
+    if variables is None:
+        variables = [
+            column
+            for column, info in VARIABLE.items()
+            if os.path.exists(f"{ProjectPath.beta_reg}/{info['abbreviation']}.csv")
+        ]
+    names: list[str] = [VARIABLE[column]["abbreviation"] for column in variables]
+    jobs: list[FigureJob] = [
+        FigureJob(
+            kind="rolling",
+            path=f"{ProjectPath.figure}/rolling/{name}.{extension}",
+            sources=[f"{ProjectPath.beta_reg}/{name}.csv"],
+            options={"title": column},
+        )
+        for column, name in zip(variables, names)
+    ]
+    if breaks and names:
+        jobs.append(
+            FigureJob(
+                kind="regime",
+                path=f"{ProjectPath.figure}/regime.{extension}",
+                sources=[f"{ProjectPath.individual_reg}/{name}.csv" for name in names],
+                options={"labels": names, "breaks": [str(date) for date in breaks]},
+            )
+        )
+    return jobs
+
+
+def render_job(item: tuple[FigureJob, Info]) -> str:
+    job, meta = item
+    return job.render(meta=meta)
+
+
+def figures(
+    variables: Optional[Sequence[str]] = None,
+    breaks: Sequence[str] = ("2000Q1",),
+    workers: Optional[int] = None,
+    extension: str = "png",
+) -> list[str]:
+    """Draw the figures of the derived beta and panel CSVs into `ProjectPath.figure`.
+
+    Each figure records the SHA-256 of its input CSVs, and is skipped while
+    they (and its options) are unchanged, so a rerun only redraws the
+    figures of variables whose outputs changed. Figures are rendered
+    across `workers` processes (all cores by default). Returns the paths
+    of the figures drawn.
+    """
+    # Inputs are hashed here, so that only stale figures reach the workers
+    stale: list[tuple[FigureJob, Info]] = [
+        (job, meta)
+        for job in figure_jobs(variables=variables, breaks=breaks, extension=extension)
+        if not job.fresh(meta=(meta := job.meta()))
+    ]
+    return parallel_map(
+        func=render_job, items=stale, workers=workers, description="Figures"
+    )
+
+
+if __name__ == "__main__":
+    pp(f"{len(figures())} figures drawn!")
@@ -3,6 +3,8 @@ from pathlib import Path
 
 sys.path.append(str(Path.cwd()))
 
+from functools import partial
+
 from src.constants import *
 from src.data.individual import IndividualGrowth, IndividualLevel
 from src.data.real import (
@@ -13,36 +15,148 @@ from src.data.real import (
 )
 from src.data.uncertainty import Uncertainty
 from src.settings import ProjectPath
+from src.utils.cache import cached_frame
 from src.utils.imports import *
+from src.utils.instrument import stage
 from src.utils.utils import *
 
+# Bump whenever the construction of the FIRE panel changes
+PANEL_VERSION: int = 1
+# Finished panels kept in memory, least recently used first
+PANEL_CACHE_SIZE: int = 32
+_PANELS: dict[tuple, tuple] = {}
+# Columns of the panel, in order
+PANEL_COLUMNS: list[str] = [
+    "period",
+    "id",
+    "error",
+    "revision",
+    "error_mean",
+    "revision_mean",
+    "error_idio",
+    "revision_idio",
+]
+# Columns of the compact panel stored as float32
+COMPACT_FLOATS: list[str] = ["error", "revision", "error_idio", "revision_idio"]
+
+
+def compact_panel(df: DataFrame) -> tuple[DataFrame, DataFrame]:
+    """Split a panel into a compact forecaster panel and a per-period consensus frame.
+
+    The panel keeps int32 `period` and `id` and float32 errors and revisions
+    (individual and idiosyncratic) on a default index, a third of the bytes
+    per row. The consensus means are kept once per period, in float64, in a
+    frame indexed by period instead of being broadcast onto every forecaster.
+    Regressions still accumulate in float64; see `weight.compact_precision`
+    for the resulting differences.
+    """
+    consensus: DataFrame = (
+        df[["period", "error_mean", "revision_mean"]]
+        .drop_duplicates(subset="period")
+        .set_index("period")
+        .sort_index()
+    )
+    panel: DataFrame = pd.DataFrame(
+        {
+            "period": df["period"].to_numpy(dtype=np.int32),
+            "id": df["id"].to_numpy(dtype=np.int32),
+        }
+        | {column: df[column].to_numpy(dtype=np.float32) for column in COMPACT_FLOATS}
+    )
+    return panel, consensus
+
+
+def expand_panel(df: DataFrame, consensus: Optional[DataFrame] = None) -> DataFrame:
+    """Inverse of `compact_panel` (float64 values); `df` itself without `consensus`."""
+    if consensus is None:
+        return df
+    return pd.merge(
+        left=df.astype(
+            {"period": np.int64, "id": np.int64}
+            | {column: float for column in COMPACT_FLOATS}
+        ),
+        right=consensus,
+        left_on="period",
+        right_index=True,
+        how="left",
+    )[PANEL_COLUMNS]
+
+
+def save_panel(
+    df: DataFrame,
+    name: str,
+    column: str,
+    verbose: bool = True,
+    consensus: Optional[DataFrame] = None,
+) -> None:
+    """Save the consensus and individual (and idiosyncratic) level data of a panel.
+
+    Pass the `consensus` frame of a compact panel to save it expanded.
+    """
+    df = expand_panel(df=df, consensus=consensus)
+    with stage("fire.save", variable=column) as record:
+        # Consensus level data saving
+        pd.merge(
+            left=df[["period", "error_mean", "revision_mean"]]
+            .drop_duplicates()
+            .rename(columns={"error_mean": "error", "revision_mean": "revision"}),
+            right=Uncertainty().df,
+            left_on="period",
+            right_index=True,
+        ).pipe(with_periods).to_csv(
+            path_or_buf=f"{ProjectPath.consensus_reg}/{name}.csv",
+            index=False,
+        )
+        # Individual (and idiosyncratic) level data saving
+        pd.merge(
+            left=df[
+                ["period", "id", "error", "revision", "error_idio", "revision_idio"]
+            ],
+            right=Uncertainty().df,
+            left_on="period",
+            right_index=True,
+        ).pipe(with_periods).to_csv(
+            path_or_buf=f"{ProjectPath.individual_reg}/{name}.csv",
+            index=False,
+        )
+        record.rows = len(df)
+    if verbose:
+        pp(f"{column} data saved successfully!")
+
 
 @dataclass
 class FireAbstract(ABC):
     column: str
     forecast_horizon: int = 4  # from quarter t − 1 to quarter t + 3
+    minimize_counts: int = 10  # `filter_id` threshold
 
     def __post_init__(self) -> None:
         # pp(self.column)
         self.name: str = VARIABLE[self.column]["abbreviation"]
+        # The consensus means are broadcast onto the panel (see `compact_panel`)
+        self.consensus: Optional[DataFrame] = None
         # Initialize
-        self.individual_init()
-        self.real_init()
+        with stage("individual", variable=self.column) as record:
+            self.individual_init()
+            record.rows = len(self.individual.df)
+        with stage("real", variable=self.column):
+            self.real_init()
         # Construct FIRE data
-        self.df: DataFrame = self.construct_fire_data()
+        with stage("fire.construct", variable=self.column) as record:
+            self.df: DataFrame = self.construct_fire_data()
+            record.rows = len(self.df)
         # pp(self.df)
         # Consensus, individual and idiosyncratic level
-        self.df: DataFrame = pd.merge(
-            left=self.df[["period", "id", "error", "revision"]],
-            right=self.df.groupby(["period"])[["error", "revision"]]
-            .mean()
-            .rename(columns={"error": "error_mean", "revision": "revision_mean"}),
-            how="inner",
-            left_on="period",
-            right_index=True,
-        )
-        self.df["error_idio"] = self.df["error"] - self.df["error_mean"]
-        self.df["revision_idio"] = self.df["revision"] - self.df["revision_mean"]
+        with stage("fire.levels", variable=self.column):
+            self.df: DataFrame = self.df[["period", "id", "error", "revision"]]
+            means: DataFrame = self.df.groupby("period")[
+                ["error", "revision"]
+            ].transform("mean")
+            self.df = self.df.assign(
+                error_mean=means["error"], revision_mean=means["revision"]
+            )
+            self.df["error_idio"] = self.df["error"] - self.df["error_mean"]
+            self.df["revision_idio"] = self.df["revision"] - self.df["revision_mean"]
         # pp(self.df)
 
     @abstractmethod
@@ -73,36 +187,19 @@ class FireAbstract(ABC):
         """Construct the FIRE data"""
 
     def filter_id(self, df: DataFrame, minimize_counts: int = 10) -> DataFrame:
-        """Filter `id` based on the counts of `id`."""
-        id_counts: Series[int] = df["id"].value_counts()
-        return df[df["id"].isin(values=id_counts[id_counts >= minimize_counts].index)]
+        """Filter `id` based on the counts of `id`.
 
-    def save(self):
-        # Consensus level data saving
-        pd.merge(
-            left=self.df[["period", "error_mean", "revision_mean"]]
-            .drop_duplicates()
-            .rename(columns={"error_mean": "error", "revision_mean": "revision"}),
-            right=Uncertainty().df,
-            left_on="period",
-            right_index=True,
-        ).to_csv(
-            path_or_buf=f"{ProjectPath.consensus_reg}/{self.name}.csv",
-            index=False,
-        )
-        # Individual (and idiosyncratic) level data saving
-        pd.merge(
-            left=self.df[
-                ["period", "id", "error", "revision", "error_idio", "revision_idio"]
-            ],
-            right=Uncertainty().df,
-            left_on="period",
-            right_index=True,
-        ).to_csv(
-            path_or_buf=f"{ProjectPath.individual_reg}/{self.name}.csv",
-            index=False,
-        )
-        pp(f"{self.column} data saved successfully!")
+        The rule is global: a forecaster kept here enters every window. Build
+        the panel with `minimize_counts=1` and pass `window_counts` to `Beta`
+        to count the observations of each window instead.
+        """
+        with stage("fire.filter_id") as record:
+            df = df[row_counts(values=df["id"].to_numpy()) >= minimize_counts]
+            record.rows = len(df)
+        return df
+
+    def save(self, verbose: bool = True) -> None:
+        save_panel(df=self.df, name=self.name, column=self.column, verbose=verbose)
 
 
 class FireGrowth(FireAbstract):
@@ -161,7 +258,7 @@ class FireGrowth(FireAbstract):
         # df["actual_growth_1"] = df.groupby(["id"])["actual_growth"].shift(1)
         # df["change"] = df["actual_growth"] - df["actual_growth_1"]
         # pp(df[df["id"] == 1])
-        return self.filter_id(df=df)
+        return self.filter_id(df=df, minimize_counts=self.minimize_counts)
 
 
 class FireLevel(FireAbstract):
@@ -178,27 +275,137 @@ class FireLevel(FireAbstract):
             how="inner",
         )
         df["error"] = df["actual_level"] - df["nowcast"]
-        return self.filter_id(df=df)
+        return self.filter_id(df=df, minimize_counts=self.minimize_counts)
 
 
 @dataclass
 class Fire:
     column: str
     forecast_horizon: int = 4
+    minimize_counts: int = 10  # `filter_id` threshold
+    cache: bool = False  # take the finished panel from `cached_panel`
+    compact: bool = False  # keep the panel as `compact_panel` does
 
     def __post_init__(self) -> None:
         info: dict[str, str] = VARIABLE[self.column]
         self.name: str = info["abbreviation"]
+        # Per-period consensus means of a compact panel
+        self.consensus: Optional[DataFrame] = None
+        if self.cache:
+            # No data objects are built; `self.fire` is not available
+            if self.compact:
+                self.df, self.consensus = cached_compact_panel(
+                    column=self.column,
+                    forecast_horizon=self.forecast_horizon,
+                    minimize_counts=self.minimize_counts,
+                )
+            else:
+                self.df: DataFrame = cached_panel(
+                    column=self.column,
+                    forecast_horizon=self.forecast_horizon,
+                    minimize_counts=self.minimize_counts,
+                )
+            self.save: Callable[..., None] = partial(
+                save_panel,
+                df=self.df,
+                name=self.name,
+                column=self.column,
+                consensus=self.consensus,
+            )
+            return
         if info["type"] == "rate":
-            self.fire: FireAbstract = FireLevel(self.column)
+            self.fire: FireAbstract = FireLevel(
+                column=self.column, minimize_counts=self.minimize_counts
+            )
         elif info["type"] == "level":
             self.fire: FireAbstract = FireGrowth(
-                column=self.column, forecast_horizon=self.forecast_horizon
+                column=self.column,
+                forecast_horizon=self.forecast_horizon,
+                minimize_counts=self.minimize_counts,
             )
         else:
             raise ValueError("Invalid type!")
-        self.df: DataFrame = self.fire.df
-        self.save: Callable[[], None] = self.fire.save
+        self.df = self.fire.df
+        self.save = self.fire.save
+        if self.compact:
+            self.df, self.consensus = compact_panel(df=self.fire.df)
+            self.save = partial(
+                save_panel,
+                df=self.df,
+                name=self.name,
+                column=self.column,
+                consensus=self.consensus,
+            )
+
+
+def panel_inputs(column: str) -> list[str]:
+    """Raw files a FIRE panel is built from."""
+    return [f"{ProjectPath.survey}/{column}.csv", f"{ProjectPath.real}/{column}.csv"]
+
+
+def cached_panel(
+    column: str, forecast_horizon: int = 4, minimize_counts: int = 10
+) -> DataFrame:
+    """Finished `Fire.df` panel, built at most once per set of inputs.
+
+    Panels are keyed by variable, horizon (ignored for rates, whose panel has
+    none), `filter_id` threshold and the raw input files. An in-memory LRU of
+    `PANEL_CACHE_SIZE` panels, invalidated by file modification times, sits in
+    front of Feather files in `cache/fire`, invalidated by the SHA-256 of the
+    inputs. The returned frame is shared and must be treated as read-only.
+    """
+    if VARIABLE[column]["type"] == "rate":
+        forecast_horizon = 0
+    return cached_on_files(
+        key=(column, forecast_horizon, minimize_counts),
+        paths=panel_inputs(column=column),
+        loader=lambda: stored_panel(
+            column=column,
+            forecast_horizon=forecast_horizon,
+            minimize_counts=minimize_counts,
+        ),
+        cache=_PANELS,
+        maxsize=PANEL_CACHE_SIZE,
+    )
+
+
+def stored_panel(column: str, forecast_horizon: int, minimize_counts: int) -> DataFrame:
+    """Panel read from (or built into) its Feather file in `cache/fire`."""
+    name: str = VARIABLE[column]["abbreviation"]
+    return cached_frame(
+        name=f"fire/{name}_h{forecast_horizon}_n{minimize_counts}",
+        source=panel_inputs(column=column),
+        loader=lambda: Fire(
+            column=column,
+            forecast_horizon=forecast_horizon or 4,
+            minimize_counts=minimize_counts,
+        ).df,
+        version=PANEL_VERSION,
+    )
+
+
+def cached_compact_panel(
+    column: str, forecast_horizon: int = 4, minimize_counts: int = 10
+) -> tuple[DataFrame, DataFrame]:
+    """`compact_panel` of `cached_panel`, held compact in the in-memory LRU.
+
+    The full panel is only read transiently from its Feather file.
+    """
+    if VARIABLE[column]["type"] == "rate":
+        forecast_horizon = 0
+    return cached_on_files(
+        key=(column, forecast_horizon, minimize_counts, "compact"),
+        paths=panel_inputs(column=column),
+        loader=lambda: compact_panel(
+            df=stored_panel(
+                column=column,
+                forecast_horizon=forecast_horizon,
+                minimize_counts=minimize_counts,
+            )
+        ),
+        cache=_PANELS,
+        maxsize=PANEL_CACHE_SIZE,
+    )
 
 
 if __name__ == "__main__":
@@ -206,6 +413,6 @@ if __name__ == "__main__":
     # pp(fire.df)
     # fire.save()
     for variable, info in VARIABLE.items():
-        fire = Fire(column=variable)
+        fire = Fire(column=variable, cache=True)
         fire.save()
     # break
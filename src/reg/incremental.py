@@ -0,0 +1,306 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import hashlib
+from collections import deque
+
+from src.constants import *
+from src.data.uncertainty import Uncertainty
+from src.reg.fire import Fire
+from src.reg.rolling import (
+    LEVELS,
+    MOMENTS,
+    PeriodMoments,
+    level_moments,
+    ols_slope,
+    weight_on_idiosyncratic,
+    window_inference,
+)
+from src.reg.weight import Beta
+from src.settings import ProjectPath
+from src.utils.cache import file_hash
+from src.utils.imports import *
+from src.utils.utils import *
+
+
+def state_path(name: str) -> str:
+    """Where the incremental state of a variable is persisted."""
+    return f"{ProjectPath.cache}/state/{name}.json"
+
+
+def derived_digests(name: str) -> dict[str, Optional[str]]:
+    """SHA-256 of the derived consensus, individual and beta CSVs (`None` if missing)."""
+    paths: list[str] = [
+        f"{directory}/{name}.csv"
+        for directory in (
+            ProjectPath.consensus_reg,
+            ProjectPath.individual_reg,
+            ProjectPath.beta_reg,
+        )
+    ]
+    return {
+        path: file_hash(path=path) if os.path.exists(path) else None for path in paths
+    }
+
+
+def rows_digest(df: DataFrame) -> str:
+    """SHA-256 of the `period`, `id`, `error` and `revision` of the panel rows.
+
+    Rows are sorted first, so that the digest does not depend on their order.
+    """
+    columns: list[np.ndarray] = [
+        period_ordinals(df["period"]),
+        df["id"].to_numpy(dtype=np.int64),
+        df["error"].to_numpy(dtype=float),
+        df["revision"].to_numpy(dtype=float),
+    ]
+    order: np.ndarray = np.lexsort(columns[::-1])
+    digest = hashlib.sha256()
+    for column in columns:
+        digest.update(np.ascontiguousarray(column[order]).tobytes())
+    return digest.hexdigest()
+
+
+def rolling_state(
+    fire: Fire, moments: dict[str, PeriodMoments], window_size: int, weight: float
+) -> Info:
+    """Everything needed to extend the panel and the rolling betas later on.
+
+    For every level this keeps the moments of the last `window_size + 1`
+    quarters and the running sums of the last window, so that a new quarter
+    only adds its own moments and drops the one leaving the window.
+    """
+    ordinals: np.ndarray = period_ordinals(fire.df["period"])
+    levels: Info = {}
+    for level, moment in moments.items():
+        trail: np.ndarray = np.vstack(
+            [np.zeros((window_size + 1, len(MOMENTS))), moment.sums]
+        )[-(window_size + 1) :]
+        levels[level] = {
+            "x_shift": moment.x_shift,
+            "y_shift": moment.y_shift,
+            "trail": trail.tolist(),
+            "window": trail[:-1].sum(axis=0).tolist(),
+        }
+    return {
+        "forecast_horizon": fire.forecast_horizon,
+        "window_size": window_size,
+        "first": int(ordinals.min()),
+        "end": int(ordinals.max()),
+        "rows": len(ordinals),
+        "digest": rows_digest(df=fire.df),
+        "weight": weight,
+        "levels": levels,
+        # The derived CSVs as written with this state, to detect other writers
+        "files": derived_digests(name=fire.name),
+    }
+
+
+def save_state(name: str, state: Info) -> None:
+    os.makedirs(os.path.dirname(state_path(name=name)), exist_ok=True)
+    with open(state_path(name=name), "w") as file:
+        json.dump(state, file)
+
+
+def load_state(name: str) -> Optional[Info]:
+    if not os.path.exists(state_path(name=name)):
+        return None
+    with open(state_path(name=name)) as file:
+        return json.load(file)
+
+
+def rebuild(fire: Fire, window_size: int, verbose: bool = True) -> DataFrame:
+    """Recompute and rewrite everything, then persist a fresh state."""
+    fire.save(verbose=verbose)
+    beta = Beta(fire=fire, window_size=window_size)
+    beta.save(verbose=verbose)
+    weight: float = (
+        float(beta.df_beta["weight"].iloc[-1]) if len(beta.df_beta) else np.nan
+    )
+    save_state(
+        name=fire.name,
+        state=rolling_state(
+            fire=fire,
+            moments=level_moments(df=fire.df),
+            window_size=window_size,
+            weight=weight,
+        ),
+    )
+    return beta.df_beta
+
+
+def append_panel(fire: Fire, df_new: DataFrame) -> None:
+    """Append the new FIRE rows to the derived consensus and individual CSVs."""
+    uncertainty: DataFrame = Uncertainty().df
+    pd.merge(
+        left=df_new[["period", "error_mean", "revision_mean"]]
+        .drop_duplicates()
+        .rename(columns={"error_mean": "error", "revision_mean": "revision"}),
+        right=uncertainty,
+        left_on="period",
+        right_index=True,
+    ).pipe(with_periods).to_csv(
+        path_or_buf=f"{ProjectPath.consensus_reg}/{fire.name}.csv",
+        mode="a",
+        header=False,
+        index=False,
+    )
+    pd.merge(
+        left=df_new[
+            ["period", "id", "error", "revision", "error_idio", "revision_idio"]
+        ],
+        right=uncertainty,
+        left_on="period",
+        right_index=True,
+    ).pipe(with_periods).to_csv(
+        path_or_buf=f"{ProjectPath.individual_reg}/{fire.name}.csv",
+        mode="a",
+        header=False,
+        index=False,
+    )
+
+
+def slide(state: Info, df_new: DataFrame, end: int) -> DataFrame:
+    """Roll every level forward over the new quarters up to `end`.
+
+    Each step adds the moments of the quarter entering the window and drops
+    those of the quarter leaving it; memory stays at `window_size + 1` rows.
+    """
+    start: int = state["end"] + 1
+    new_beta: dict[str, list[float]] = {}
+    labels: list[int] = []
+    # Moments of the new quarters, centered like the persisted ones
+    moments: dict[str, PeriodMoments] = level_moments(
+        df=df_new,
+        start=start,
+        periods=end - state["end"],
+        shifts={
+            level: (level_state["x_shift"], level_state["y_shift"])
+            for level, level_state in state["levels"].items()
+        },
+    )
+    for level in LEVELS:
+        level_state: Info = state["levels"][level]
+        entering: np.ndarray = moments[level].sums
+        trail: deque = deque(np.asarray(level_state["trail"]))
+        window: np.ndarray = np.asarray(level_state["window"])
+        new_beta[level] = []
+        for quarter, moment in enumerate(entering, start=start):
+            # Window ending at `quarter - 1`
+            window = window + trail[-1] - trail[0]
+            new_beta[level].append(float(ols_slope(window)))
+            if level == "individual":
+                # Label with the last non-empty quarter of the window (its
+                # last quarter if it has none)
+                observed: np.ndarray = np.flatnonzero(np.asarray(trail)[1:, 0] > 0)
+                labels.append(
+                    quarter - state["window_size"] + int(observed[-1])
+                    if len(observed)
+                    else quarter - 1
+                )
+            trail.append(moment)
+            trail.popleft()
+        level_state["trail"] = np.asarray(trail).tolist()
+        level_state["window"] = window.tolist()
+    state["end"] = end
+    return pd.DataFrame(new_beta, index=pd.Index(labels, name="period"))
+
+
+def update(
+    column: str,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    verbose: bool = True,
+) -> DataFrame:
+    """Bring the derived CSVs of one variable up to date with its raw inputs.
+
+    The FIRE panel is rebuilt from the (cached) inputs and compared with the
+    persisted state. Only rows of quarters after the last persisted one are
+    appended to the derived panels, and only the windows they complete are
+    added to the beta CSV. If any persisted row changed (as told by the
+    `rows_digest` of the rows up to the last persisted quarter) — a revised
+    survey value, or a forecaster crossing the `filter_id` threshold, which
+    adds history —, if the derived CSVs are no longer those the state was
+    saved with, if the state covers fewer than `window_size` quarters or if
+    there is no compatible state, everything is rebuilt. Returns the beta rows
+    that were written.
+    """
+    fire = Fire(column=column, forecast_horizon=forecast_horizon, cache=True)
+    state: Optional[Info] = load_state(name=fire.name)
+    if (
+        state is None
+        or state["forecast_horizon"] != forecast_horizon
+        or state["window_size"] != window_size
+    ):
+        return rebuild(fire=fire, window_size=window_size, verbose=verbose)
+    ordinals: np.ndarray = period_ordinals(fire.df["period"])
+    persisted: np.ndarray = ordinals <= state["end"]
+    if (
+        len(state["levels"]["individual"]["window"]) != len(MOMENTS)
+        # The trail of a state shorter than a window is zero-padded, so it
+        # would slide windows starting before the panel
+        or state.get("first") is None
+        or state["end"] - state["first"] + 1 < window_size
+        # The derived CSVs were rewritten since (by `run` or `build`, say)
+        or state.get("files") != derived_digests(name=fire.name)
+        or persisted.sum() != state["rows"]
+        or rows_digest(df=fire.df[persisted]) != state.get("digest")
+    ):
+        return rebuild(fire=fire, window_size=window_size, verbose=verbose)
+    df_new: DataFrame = fire.df[~persisted]
+    if df_new.empty:
+        if verbose:
+            pp(f"{column} is up to date!")
+        return pd.DataFrame()
+    append_panel(fire=fire, df_new=df_new)
+    # New rolling windows
+    df_beta: DataFrame = slide(state=state, df_new=df_new, end=int(ordinals.max()))
+    df_beta["weight"] = weight_on_idiosyncratic(df_beta=df_beta)
+    df_beta = pd.merge(
+        left=df_beta,
+        right=Uncertainty().df,
+        how="left",
+        left_index=True,
+        right_index=True,
+    )
+    weight: Series = pd.concat([pd.Series([state["weight"]]), df_beta["weight"]])
+    df_beta["weight_change"] = weight.diff().to_numpy()[1:]
+    df_beta["weight_change_rate"] = (
+        df_beta["weight_change"] / weight.shift(1).to_numpy()[1:]
+    ) * 100
+    # Standard errors of the new windows only: they cover the last
+    # `window_size + len(df_beta)` quarters, whose moments are all they need
+    first: int = int(ordinals.max()) + 1 - window_size - len(df_beta)
+    df_recent: DataFrame = fire.df[ordinals >= first]
+    df_se: DataFrame = window_inference(
+        df=df_recent,
+        window_size=window_size,
+        moments=level_moments(
+            df=df_recent, start=first, periods=window_size + len(df_beta)
+        ),
+    )
+    df_beta[df_se.columns] = df_se.to_numpy()
+    df_beta.index = ordinals_to_period(df_beta.index).rename("period")
+    df_beta.to_csv(
+        path_or_buf=f"{ProjectPath.beta_reg}/{fire.name}.csv",
+        mode="a",
+        header=False,
+        index=True,
+    )
+    state.update(
+        rows=len(ordinals),
+        digest=rows_digest(df=fire.df),
+        weight=float(df_beta["weight"].iloc[-1]),
+        files=derived_digests(name=fire.name),
+    )
+    save_state(name=fire.name, state=state)
+    if verbose:
+        pp(f"{column}: {len(df_new)} rows and {len(df_beta)} windows appended!")
+    return df_beta
+
+
+if __name__ == "__main__":
+    for variable in VARIABLE:
+        update(column=variable)
@@ -0,0 +1,177 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from functools import partial
+
+from src.constants import *
+from src.data.uncertainty import uncertainty_inputs
+from src.reg.fire import PANEL_VERSION, Fire, panel_inputs
+from src.reg.incremental import update
+from src.reg.weight import Beta
+from src.settings import ProjectPath
+from src.utils.dag import Node, run_dag
+from src.utils.imports import *
+from src.utils.utils import *
+
+
+def run_variable(
+    column: str,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    save: bool = True,
+    incremental: bool = False,
+) -> DataFrame:
+    """Build the FIRE panel and the rolling betas of one variable."""
+    if incremental:
+        # Only the new quarters are appended to the derived CSVs
+        return update(
+            column=column,
+            forecast_horizon=forecast_horizon,
+            window_size=window_size,
+            verbose=False,
+        )
+    fire = Fire(column=column, forecast_horizon=forecast_horizon, cache=True)
+    beta = Beta(fire=fire, window_size=window_size)
+    if save:
+        fire.save(verbose=False)
+        beta.save(verbose=False)
+    return beta.df_beta
+
+
+def run(
+    variables: Optional[Sequence[str]] = None,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    workers: Optional[int] = None,
+    save: bool = True,
+    incremental: bool = False,
+) -> dict[str, DataFrame]:
+    """Run Fire construction and Beta estimation for every variable.
+
+    Variables are spread across `workers` processes (all cores by default,
+    `workers=1` runs in this process). The returned `df_beta` frames are keyed
+    by variable in the order of `variables`, whatever order they finish in.
+    With `incremental=True` only quarters added since the last run are
+    processed, and the frames hold just the appended windows.
+    """
+    variables = list(VARIABLE) if variables is None else list(variables)
+    results: list[DataFrame] = parallel_map(
+        func=partial(
+            run_variable,
+            forecast_horizon=forecast_horizon,
+            window_size=window_size,
+            save=save,
+            incremental=incremental,
+        ),
+        items=variables,
+        workers=workers,
+        description="Fire & Beta",
+    )
+    pp(f"{len(variables)} variables done!")
+    return dict(zip(variables, results))
+
+
+def build_panel(column: str, forecast_horizon: int, minimize_counts: int) -> None:
+    """Save the consensus and individual CSVs of one variable."""
+    Fire(
+        column=column,
+        forecast_horizon=forecast_horizon or 4,
+        minimize_counts=minimize_counts,
+        cache=True,
+    ).save(verbose=False)
+
+
+def build_beta(
+    column: str, forecast_horizon: int, window_size: int, minimize_counts: int
+) -> None:
+    """Save the beta CSV of one variable."""
+    fire = Fire(
+        column=column,
+        forecast_horizon=forecast_horizon or 4,
+        minimize_counts=minimize_counts,
+        cache=True,
+    )
+    Beta(fire=fire, window_size=window_size).save(verbose=False)
+
+
+def pipeline_nodes(
+    variables: Optional[Sequence[str]] = None,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    minimize_counts: int = 10,
+) -> list[Node]:
+    """The `fire/{name}` and `beta/{name}` nodes of every variable.
+
+    Both read the raw survey, real-time and uncertainty CSVs: `fire/{name}`
+    writes `data/derived/{consensus,individual}` and `beta/{name}`, which runs
+    after it to reuse its cached panel, `data/derived/beta`. Rates have no
+    horizon, so their nodes ignore `forecast_horizon`.
+    """
+    variables = list(VARIABLE) if variables is None else list(variables)
+    nodes: list[Node] = []
+    for column in variables:
+        name: str = VARIABLE[column]["abbreviation"]
+        horizon: int = 0 if VARIABLE[column]["type"] == "rate" else forecast_horizon
+        panel: Info = {
+            "column": column,
+            "forecast_horizon": horizon,
+            "minimize_counts": minimize_counts,
+        }
+        individual: str = f"{ProjectPath.individual_reg}/{name}.csv"
+        nodes += [
+            Node(
+                name=f"fire/{name}",
+                task=build_panel,
+                inputs=panel_inputs(column=column) + uncertainty_inputs(),
+                outputs=[f"{ProjectPath.consensus_reg}/{name}.csv", individual],
+                kwargs=panel,
+                params=panel | {"panel_version": PANEL_VERSION},
+            ),
+            Node(
+                name=f"beta/{name}",
+                task=build_beta,
+                # `build_beta` reads the panel from the raw files, through the
+                # panel cache that `fire/{name}` fills first
+                inputs=panel_inputs(column=column) + uncertainty_inputs(),
+                outputs=[f"{ProjectPath.beta_reg}/{name}.csv"],
+                kwargs=panel | {"window_size": window_size},
+                params=panel
+                | {"panel_version": PANEL_VERSION, "window_size": window_size},
+                after=[f"fire/{name}"],
+            ),
+        ]
+    return nodes
+
+
+def build(
+    variables: Optional[Sequence[str]] = None,
+    forecast_horizon: int = 4,
+    window_size: int = WINDOW_SIZE,
+    minimize_counts: int = 10,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> list[str]:
+    """Rebuild only the derived CSVs whose inputs or parameters changed.
+
+    Unlike `run`, which recomputes every variable, each node is fingerprinted
+    by the content of its input files and its parameters (see `run_dag`);
+    the stale ones run across `workers` processes. Returns the nodes built.
+    """
+    built: list[str] = run_dag(
+        nodes=pipeline_nodes(
+            variables=variables,
+            forecast_horizon=forecast_horizon,
+            window_size=window_size,
+            minimize_counts=minimize_counts,
+        ),
+        workers=workers,
+        force=force,
+    )
+    pp(f"{len(built)} nodes built!")
+    return built
+
+
+if __name__ == "__main__":
+    build()
@@ -3,81 +3,141 @@ from pathlib import Path
 
 sys.path.append(str(Path.cwd()))
 
+import matplotlib.pyplot as plt
+
 from src.constants import *
+from src.reg.regime import regimes
 from src.utils.imports import *
 from src.utils.utils import *
 
-# Data definition
-data = {
-    "Variable": ["RGDP", "NGDP", "UNEMP", "RNRESIN", "RRESIN"],
-    "Individual Before 2000": [-0.224, -0.294, 0.141, -0.193, -0.258],
-    "Individual After 2000": [-0.439, -0.309, -0.281, -0.302, -0.236],
-    "Consensus Before 2000": [0.543, 0.406, 0.650, 0.743, 0.783],
-    "Consensus After 2000": [-0.385, -0.108, -0.224, -0.012, 0.312],
-    "Idiosyncratic Before 2000": [-0.442, -0.430, -0.190, -0.419, -0.504],
-    "Idiosyncratic After 2000": [-0.504, -0.511, -0.356, -0.559, -0.472],
-    "Weight Before 2000": [77.87, 83.73, 60.60, 80.55, 80.89],
-    "Weight After 2000": [45.38, 49.88, 43.18, 53.02, 69.90]
-}
+if __name__ == "__main__":
+    # Coefficients and weights before and after 2000, from the per-period moment sums
+    variables = [
+        "Real GDP",
+        "Nominal GDP",
+        "Unemployment Rate",
+        "Real Nonresidential Investment",
+        "Real Residential Investment",
+    ]
+    df_regime = regimes(variables=variables, breaks=["2000Q1"])
+    data = {"Variable": [VARIABLE[variable]["abbreviation"] for variable in variables]}
+    for series in ["individual", "consensus", "idiosyncratic", "weight"]:
+        scale = 100 if series == "weight" else 1
+        for regime, label in [
+            ("before 2000Q1", "Before 2000"),
+            ("from 2000Q1", "After 2000"),
+        ]:
+            data[f"{series.capitalize()} {label}"] = [
+                scale * df_regime.loc[(variable, regime), series]
+                for variable in variables
+            ]
 
-df = pd.DataFrame(data)
+    df = pd.DataFrame(data)
 
-# Plot configuration
-plt.rcParams.update({'font.size': 16})  # Updating font size and weight
-fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(14, 12))
-bar_width = 0.35
-index = np.arange(len(df))
-colors = ["#000000", "#808080"]  # Using vivid green and red for clear distinction
+    # Plot configuration
+    plt.rcParams.update({"font.size": 16})  # Updating font size and weight
+    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(14, 12))
+    bar_width = 0.35
+    index = np.arange(len(df))
+    colors = ["#000000", "#808080"]  # Using vivid green and red for clear distinction
 
-# Individual Coefficients
-axes[0, 0].bar(index - bar_width/2, df["Individual Before 2000"], bar_width, label='Before 2000', color=colors[0])
-axes[0, 0].bar(index + bar_width/2, df["Individual After 2000"], bar_width, label='After 2000', color=colors[1])
-axes[0, 0].set_title('Individual Coefficients')
-axes[0, 0].set_xticks(index)
-axes[0, 0].set_xticklabels(df["Variable"], rotation=45)
+    # Individual Coefficients
+    axes[0, 0].bar(
+        index - bar_width / 2,
+        df["Individual Before 2000"],
+        bar_width,
+        label="Before 2000",
+        color=colors[0],
+    )
+    axes[0, 0].bar(
+        index + bar_width / 2,
+        df["Individual After 2000"],
+        bar_width,
+        label="After 2000",
+        color=colors[1],
+    )
+    axes[0, 0].set_title("Individual Coefficients")
+    axes[0, 0].set_xticks(index)
+    axes[0, 0].set_xticklabels(df["Variable"], rotation=45)
 
-# Consensus Coefficients
-axes[0, 1].bar(index - bar_width/2, df["Consensus Before 2000"], bar_width, label='Before 2000', color=colors[0])
-axes[0, 1].bar(index + bar_width/2, df["Consensus After 2000"], bar_width, label='After 2000', color=colors[1])
-axes[0, 1].set_title('Consensus Coefficients')
-axes[0, 1].set_xticks(index)
-axes[0, 1].set_xticklabels(df["Variable"], rotation=45)
+    # Consensus Coefficients
+    axes[0, 1].bar(
+        index - bar_width / 2,
+        df["Consensus Before 2000"],
+        bar_width,
+        label="Before 2000",
+        color=colors[0],
+    )
+    axes[0, 1].bar(
+        index + bar_width / 2,
+        df["Consensus After 2000"],
+        bar_width,
+        label="After 2000",
+        color=colors[1],
+    )
+    axes[0, 1].set_title("Consensus Coefficients")
+    axes[0, 1].set_xticks(index)
+    axes[0, 1].set_xticklabels(df["Variable"], rotation=45)
 
-# Idiosyncratic Coefficients
-axes[1, 0].bar(index - bar_width/2, df["Idiosyncratic Before 2000"], bar_width, label='Before 2000', color=colors[0])
-axes[1, 0].bar(index + bar_width/2, df["Idiosyncratic After 2000"], bar_width, label='After 2000', color=colors[1])
-axes[1, 0].set_title('Idiosyncratic Coefficients')
-axes[1, 0].set_xticks(index)
-axes[1, 0].set_xticklabels(df["Variable"], rotation=45)
+    # Idiosyncratic Coefficients
+    axes[1, 0].bar(
+        index - bar_width / 2,
+        df["Idiosyncratic Before 2000"],
+        bar_width,
+        label="Before 2000",
+        color=colors[0],
+    )
+    axes[1, 0].bar(
+        index + bar_width / 2,
+        df["Idiosyncratic After 2000"],
+        bar_width,
+        label="After 2000",
+        color=colors[1],
+    )
+    axes[1, 0].set_title("Idiosyncratic Coefficients")
+    axes[1, 0].set_xticks(index)
+    axes[1, 0].set_xticklabels(df["Variable"], rotation=45)
 
-# Weights
-axes[1, 1].bar(index - bar_width/2, df["Weight Before 2000"], bar_width, label='Before 2000', color=colors[0])
-axes[1, 1].bar(index + bar_width/2, df["Weight After 2000"], bar_width, label='After 2000', color=colors[1])
-axes[1, 1].set_title('Weights on Idiosyncratic')
-axes[1, 1].set_xticks(index)
-axes[1, 1].set_xticklabels(df["Variable"], rotation=45)
-i=0
-# Global settings
-for ax in axes.flat:
-    i+=1
-    # ax.set_xlabel("Variable")
-    if i<4:
-        ax.set_ylabel("Coefficients")
-    elif i ==4:
-        ax.set_ylabel("Weights(%)")
-    ax.grid(True, linestyle='--', alpha=0.6)  # Add gridlines for better readability
+    # Weights
+    axes[1, 1].bar(
+        index - bar_width / 2,
+        df["Weight Before 2000"],
+        bar_width,
+        label="Before 2000",
+        color=colors[0],
+    )
+    axes[1, 1].bar(
+        index + bar_width / 2,
+        df["Weight After 2000"],
+        bar_width,
+        label="After 2000",
+        color=colors[1],
+    )
+    axes[1, 1].set_title("Weights on Idiosyncratic")
+    axes[1, 1].set_xticks(index)
+    axes[1, 1].set_xticklabels(df["Variable"], rotation=45)
+    i = 0
+    # Global settings
+    for ax in axes.flat:
+        i += 1
+        # ax.set_xlabel("Variable")
+        if i < 4:
+            ax.set_ylabel("Coefficients")
+        elif i == 4:
+            ax.set_ylabel("Weights(%)")
+        ax.grid(True, linestyle="--", alpha=0.6)  # Add gridlines for better readability
 
-# Add a legend to explain colors
-fig.legend(
-    ["Before 2000", "After 2000"],
-    loc="lower center",
-    ncol=2,
-    frameon=False,
-    fontsize="large",
-)
+    # Add a legend to explain colors
+    fig.legend(
+        ["Before 2000", "After 2000"],
+        loc="lower center",
+        ncol=2,
+        frameon=False,
+        fontsize="large",
+    )
 
-plt.tight_layout()
+    plt.tight_layout()
 
-fig.subplots_adjust(bottom=0.14, top=0.95)
+    fig.subplots_adjust(bottom=0.14, top=0.95)
 
-plt.show()
+    plt.show()
@@ -0,0 +1,231 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from functools import partial
+
+from src.constants import *
+from src.reg.fire import cached_panel
+from src.reg.rolling import LEVELS, MOMENTS, PeriodMoments, level_moments, ols_slope
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Period masks: a function of the quarters, or the quarters themselves
+Mask = Union[Callable[[PeriodIndex], np.ndarray], Iterable[Period | str]]
+
+
+def quarter_grid(moments: dict[str, PeriodMoments]) -> PeriodIndex:
+    """Quarters of the per-period moments."""
+    individual: PeriodMoments = moments["individual"]
+    return ordinals_to_period(individual.start + np.arange(individual.periods))
+
+
+def break_masks(
+    grid: PeriodIndex, breaks: Sequence[Period | str]
+) -> dict[str, np.ndarray]:
+    """Masks of the regimes between consecutive `breaks` (each starts a regime)."""
+    bounds: list[Period] = sorted(pd.Period(date, freq="Q") for date in breaks)
+    ordinals: np.ndarray = grid.asi8
+    masks: dict[str, np.ndarray] = {f"before {bounds[0]}": ordinals < bounds[0].ordinal}
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        masks[f"{start}-{end - 1}"] = (ordinals >= start.ordinal) & (
+            ordinals < end.ordinal
+        )
+    masks[f"from {bounds[-1]}"] = ordinals >= bounds[-1].ordinal
+    return masks
+
+
+def period_masks(grid: PeriodIndex, masks: dict[str, Mask]) -> dict[str, np.ndarray]:
+    """Evaluate named period masks on the quarters `grid`."""
+    return {
+        name: (
+            np.asarray(mask(grid), dtype=bool)
+            if callable(mask)
+            else grid.isin(pd.PeriodIndex([pd.Period(p, freq="Q") for p in mask]))
+        )
+        for name, mask in masks.items()
+    }
+
+
+def masked_sums(moments: dict[str, PeriodMoments], masks: np.ndarray) -> np.ndarray:
+    """Moment sums of every level over each mask of quarters, (masks, levels, 6).
+
+    One product of the (masks, periods) matrix with the per-period sums: a
+    subsample costs a row of the matrix, not a refit.
+    """
+    stacked: np.ndarray = np.stack([moments[level].sums for level in LEVELS], axis=1)
+    return (masks.astype(float) @ stacked.reshape(len(stacked), -1)).reshape(
+        len(masks), len(LEVELS), len(MOMENTS)
+    )
+
+
+def regime_beta(
+    moments: dict[str, PeriodMoments], masks: dict[str, np.ndarray]
+) -> DataFrame:
+    """Coefficients, weight and sample sizes of every regime.
+
+    `observations` counts the forecaster rows and `quarters` the non-empty
+    quarters (the observations of the consensus regression).
+    """
+    sums: np.ndarray = masked_sums(
+        moments=moments, masks=np.stack(list(masks.values()))
+    )
+    df: DataFrame = pd.DataFrame(
+        ols_slope(sums), columns=list(LEVELS), index=pd.Index(masks, name="regime")
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["weight"] = (df["individual"] - df["consensus"]) / (
+            df["idiosyncratic"] - df["consensus"]
+        )
+    df["observations"] = sums[:, list(LEVELS).index("individual"), 0].astype(int)
+    df["quarters"] = sums[:, list(LEVELS).index("consensus"), 0].astype(int)
+    return df
+
+
+def panel_regimes(
+    df: DataFrame,
+    breaks: Optional[Sequence[Period | str]] = None,
+    masks: Optional[dict[str, Mask]] = None,
+) -> DataFrame:
+    """Regime estimates of a panel with `period`, `revision` and `error` columns."""
+    moments: dict[str, PeriodMoments] = level_moments(df=df)
+    grid: PeriodIndex = quarter_grid(moments=moments)
+    regimes: dict[str, np.ndarray] = (
+        break_masks(grid=grid, breaks=breaks) if breaks else {}
+    ) | period_masks(grid=grid, masks=masks or {})
+    return regime_beta(moments=moments, masks=regimes)
+
+
+def regime_variable(
+    column: str,
+    breaks: Optional[Sequence[Period | str]] = None,
+    masks: Optional[dict[str, Mask]] = None,
+    forecast_horizon: int = 4,
+) -> DataFrame:
+    """Regime estimates of one variable from its cached FIRE panel."""
+    return (
+        panel_regimes(
+            df=cached_panel(column=column, forecast_horizon=forecast_horizon),
+            breaks=breaks,
+            masks=masks,
+        )
+        .reset_index()
+        .assign(variable=column)
+    )
+
+
+def regimes(
+    variables: Optional[Sequence[str]] = None,
+    breaks: Optional[Sequence[Period | str]] = None,
+    masks: Optional[dict[str, Mask]] = None,
+    forecast_horizon: int = 4,
+    workers: Optional[int] = 1,
+) -> DataFrame:
+    """Consensus, individual and idiosyncratic coefficients and weight per variable and regime.
+
+    Regimes are the spans between the `breaks` (each date starts a regime)
+    and/or the named `masks`, either functions of a `PeriodIndex` of quarters
+    returning booleans or collections of quarters. Every subsample is
+    summed from the per-period moments of the panel. Variables are spread
+    across `workers` processes (masks must then be picklable).
+    """
+    if not breaks and not masks:
+        raise ValueError("Pass break dates and/or period masks!")
+    variables = list(VARIABLE) if variables is None else list(variables)
+    frames: list[DataFrame] = parallel_map(
+        func=partial(
+            regime_variable,
+            breaks=breaks,
+            masks=masks,
+            forecast_horizon=forecast_horizon,
+        ),
+        items=variables,
+        workers=workers,
+        description="Regimes",
+    )
+    return pd.concat(frames, ignore_index=True).set_index(["variable", "regime"])
+
+
+def break_wald(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Wald statistics of equal slopes on both sides of a break, from moments (..., 6).
+
+    Intercepts and slopes differ across the break, and the error variance
+    is pooled over the n - 4 degrees of freedom (the Chow test). It is
+    asymptotically χ²(1) under no break, with homoskedastic, uncorrelated
+    errors.
+    """
+    fits: list[tuple[np.ndarray, ...]] = []
+    for sums in (before, after):
+        n, sx, sy, sxy, sxx, syy = np.moveaxis(sums, -1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cxx, cxy, cyy = sxx - sx * sx / n, sxy - sx * sy / n, syy - sy * sy / n
+            slope: np.ndarray = cxy / cxx
+        fits.append((n, cxx, slope, cyy - slope * cxy))
+    (n0, cxx0, slope0, rss0), (n1, cxx1, slope1, rss1) = fits
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance: np.ndarray = (rss0 + rss1) / (n0 + n1 - 4)
+        return (slope0 - slope1) ** 2 / (variance * (1 / cxx0 + 1 / cxx1))
+
+
+def break_search(
+    column: str,
+    candidates: Optional[Sequence[Period | str]] = None,
+    trim: float = 0.15,
+    forecast_horizon: int = 4,
+) -> DataFrame:
+    """Slopes on both sides of, and Wald statistics of, a break at every candidate.
+
+    A candidate date starts the second regime. By default every quarter
+    leaving at least `trim` of the non-empty quarters on each side is a
+    candidate (Andrews, 1993). Each candidate is one row of a mask matrix
+    over the per-period moments, so hundreds of them cost one matrix
+    product; the sup-Wald break of each level is given by `sup_wald`.
+    """
+    moments: dict[str, PeriodMoments] = level_moments(
+        df=cached_panel(column=column, forecast_horizon=forecast_horizon)
+    )
+    grid: PeriodIndex = quarter_grid(moments=moments)
+    observed: np.ndarray = moments["individual"].sums[:, 0] > 0
+    if candidates is None:
+        share: np.ndarray = np.cumsum(observed) / observed.sum()
+        # Quarters before the candidate hold `share` of the non-empty ones
+        before_share: np.ndarray = np.concatenate([[0.0], share[:-1]])
+        breaks: PeriodIndex = grid[
+            observed & (before_share >= trim) & (before_share <= 1 - trim)
+        ]
+    else:
+        breaks = pd.PeriodIndex([pd.Period(date, freq="Q") for date in candidates])
+    before: np.ndarray = grid.asi8[None, :] < breaks.asi8[:, None]
+    sums_before: np.ndarray = masked_sums(moments=moments, masks=before)
+    sums_after: np.ndarray = masked_sums(moments=moments, masks=~before)
+    df: DataFrame = pd.DataFrame(index=breaks.rename("break"))
+    for j, level in enumerate(LEVELS):
+        df[f"{level}_before"] = ols_slope(sums_before[:, j])
+        df[f"{level}_after"] = ols_slope(sums_after[:, j])
+        df[f"{level}_wald"] = break_wald(
+            before=sums_before[:, j], after=sums_after[:, j]
+        )
+    return df
+
+
+def sup_wald(df_search: DataFrame) -> DataFrame:
+    """Break date and statistic of the largest Wald statistic of each level.
+
+    Compare the statistic with the critical values of Andrews (1993) for
+    one restriction and the trimming used, not with those of χ²(1).
+    """
+    return pd.DataFrame(
+        {
+            level: {
+                "break": df_search[f"{level}_wald"].idxmax(),
+                "sup_wald": df_search[f"{level}_wald"].max(),
+            }
+            for level in LEVELS
+        }
+    ).T.rename_axis("level")
+
+
+if __name__ == "__main__":
+    pp(regimes(breaks=["2000Q1"]))
+    pp(sup_wald(break_search(column="Real GDP")))
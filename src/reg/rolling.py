@@ -0,0 +1,702 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from src.constants import *
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Column order of the moment arrays: Σ1, Σx, Σy, Σxy, Σx², Σy²
+MOMENTS: list[str] = ["n", "x", "y", "xy", "xx", "yy"]
+
+# (x, y) columns of the error-on-revision regression at each level
+LEVELS: dict[str, tuple[str, str]] = {
+    "consensus": ("revision_mean", "error_mean"),
+    "individual": ("revision", "error"),
+    "idiosyncratic": ("revision_idio", "error_idio"),
+}
+
+
+@dataclass
+class PeriodMoments:
+    """Per-period sums of a univariate regression `y ~ 1 + x` on a dense quarterly grid.
+
+    Row `i` of `sums` holds Σ1, Σx, Σy, Σxy, Σx², Σy² of the observations in quarter
+    `start + i`. `x` and `y` are centered on `x_shift`/`y_shift` before
+    accumulating, which leaves the slope unchanged and keeps the window
+    differences of the cumulative sums well conditioned.
+    """
+
+    start: int
+    sums: np.ndarray
+    x_shift: float = 0.0
+    y_shift: float = 0.0
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ordinals: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        start: Optional[int] = None,
+        periods: Optional[int] = None,
+        x_shift: Optional[float] = None,
+        y_shift: Optional[float] = None,
+    ) -> Self:
+        """Accumulate the moments of observations keyed by period ordinal.
+
+        The centering shifts default to the sample means; pass them explicitly to
+        accumulate moments that can be added to an existing set.
+        """
+        start = int(ordinals.min()) if start is None else start
+        periods = int(ordinals.max()) - start + 1 if periods is None else periods
+        x_shift = float(x.mean()) if x_shift is None else x_shift
+        y_shift = float(y.mean()) if y_shift is None else y_shift
+        x, y = x - x_shift, y - y_shift
+        position: np.ndarray = ordinals - start
+        sums: np.ndarray = np.column_stack(
+            [
+                np.bincount(position, weights=weights, minlength=periods)
+                for weights in (np.ones_like(x), x, y, x * y, x * x, y * y)
+            ]
+        )
+        return cls(start=start, sums=sums, x_shift=x_shift, y_shift=y_shift)
+
+    @property
+    def periods(self) -> int:
+        return self.sums.shape[0]
+
+    def rolling(self, window_size: int) -> np.ndarray:
+        """Moment sums of every window of `window_size` consecutive quarters.
+
+        Row `i` covers quarters `start + i` to `start + i + window_size - 1`.
+        """
+        cumsum: np.ndarray = np.vstack(
+            [np.zeros((1, self.sums.shape[1])), np.cumsum(self.sums, axis=0)]
+        )
+        return cumsum[window_size:] - cumsum[:-window_size]
+
+
+@dataclass
+class StreamingOLS:
+    """Univariate regression `y ~ 1 + x` over a multiset of rows that can grow and shrink.
+
+    Keeps n, the means and the co-moments Σ(x - x̄)², Σ(x - x̄)(y - ȳ),
+    Σ(y - ȳ)² and merges or removes batches with Chan's pairwise update, so a
+    sliding window costs O(rows entering + rows leaving) per step.
+    """
+
+    n: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    cxx: float = 0.0
+    cxy: float = 0.0
+    cyy: float = 0.0
+
+    @staticmethod
+    def batch(
+        x: np.ndarray, y: np.ndarray
+    ) -> tuple[int, float, float, float, float, float]:
+        """n, means and centered co-moments of a batch (two-pass)."""
+        mean_x, mean_y = float(x.mean()), float(y.mean())
+        dx, dy = x - mean_x, y - mean_y
+        return len(x), mean_x, mean_y, float(dx @ dx), float(dx @ dy), float(dy @ dy)
+
+    def add(self, x: np.ndarray, y: np.ndarray) -> Self:
+        """Add rows to the regression."""
+        if len(x) == 0:
+            return self
+        nb, mxb, myb, cxxb, cxyb, cyyb = self.batch(x=x, y=y)
+        n: int = self.n + nb
+        dx, dy = mxb - self.mean_x, myb - self.mean_y
+        factor: float = self.n * nb / n
+        self.cxx += cxxb + dx * dx * factor
+        self.cxy += cxyb + dx * dy * factor
+        self.cyy += cyyb + dy * dy * factor
+        self.mean_x += dx * nb / n
+        self.mean_y += dy * nb / n
+        self.n = n
+        return self
+
+    def remove(self, x: np.ndarray, y: np.ndarray) -> Self:
+        """Remove rows that were previously added."""
+        if len(x) == 0:
+            return self
+        nb, mxb, myb, cxxb, cxyb, cyyb = self.batch(x=x, y=y)
+        n: int = self.n - nb
+        if n <= 0:
+            self.n, self.mean_x, self.mean_y = 0, 0.0, 0.0
+            self.cxx = self.cxy = self.cyy = 0.0
+            return self
+        # Means of the remaining rows, then undo the pairwise merge
+        mean_x: float = (self.n * self.mean_x - nb * mxb) / n
+        mean_y: float = (self.n * self.mean_y - nb * myb) / n
+        dx, dy = mxb - mean_x, myb - mean_y
+        factor: float = n * nb / self.n
+        self.cxx -= cxxb + dx * dx * factor
+        self.cxy -= cxyb + dx * dy * factor
+        self.cyy -= cyyb + dy * dy * factor
+        self.mean_x, self.mean_y, self.n = mean_x, mean_y, n
+        return self
+
+    @property
+    def slope(self) -> float:
+        return self.cxy / self.cxx if self.cxx > 0 else np.nan
+
+    @property
+    def intercept(self) -> float:
+        return self.mean_y - self.slope * self.mean_x
+
+    @property
+    def residual_variance(self) -> float:
+        """Σ residual² / (n - 2)."""
+        if self.n <= 2 or self.cxx <= 0:
+            return np.nan
+        return max(self.cyy - self.cxy * self.cxy / self.cxx, 0.0) / (self.n - 2)
+
+
+def ols_slope(sums: np.ndarray) -> np.ndarray:
+    """Slope of `y ~ 1 + x` from stacked moment sums (..., 6)."""
+    n, sx, sy, sxy, sxx = np.moveaxis(sums, -1, 0)[:5]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (sxy - sx * sy / n) / (sxx - sx * sx / n)
+
+
+def period_means(
+    ordinals: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    consensus: Optional[DataFrame] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted periods, consensus means of `x` and `y` and the period of every row.
+
+    The means are those of the `consensus` frame of a compact panel if given.
+    """
+    if consensus is not None:
+        periods: np.ndarray = period_ordinals(consensus.index)
+        inverse: np.ndarray = np.searchsorted(periods, ordinals)
+        mean_x: np.ndarray = consensus[LEVELS["consensus"][0]].to_numpy(dtype=float)
+        mean_y: np.ndarray = consensus[LEVELS["consensus"][1]].to_numpy(dtype=float)
+        return periods, mean_x, mean_y, inverse
+    periods, inverse, counts = np.unique(
+        ordinals, return_inverse=True, return_counts=True
+    )
+    return (
+        periods,
+        np.bincount(inverse, weights=x) / counts,
+        np.bincount(inverse, weights=y) / counts,
+        inverse,
+    )
+
+
+def level_arrays(
+    df: DataFrame, level: str, consensus: Optional[DataFrame] = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Period ordinals, `x` and `y` of the regression at `level`.
+
+    Only `period`, `revision` and `error` are read: the consensus level has
+    one row per period with its means and the idiosyncratic level the
+    deviations from them. Pass the `consensus` frame of a compact panel
+    (`compact_panel`) to take its means instead.
+    """
+    ordinals: np.ndarray = period_ordinals(df["period"])
+    x_column, y_column = LEVELS["individual"]
+    x: np.ndarray = df[x_column].to_numpy(dtype=float)
+    y: np.ndarray = df[y_column].to_numpy(dtype=float)
+    if level == "individual":
+        return ordinals, x, y
+    periods, mean_x, mean_y, inverse = period_means(
+        ordinals=ordinals, x=x, y=y, consensus=consensus
+    )
+    if level == "consensus":
+        return periods, mean_x, mean_y
+    return ordinals, x - mean_x[inverse], y - mean_y[inverse]
+
+
+def level_moments(
+    df: DataFrame,
+    consensus: Optional[DataFrame] = None,
+    start: Optional[int] = None,
+    periods: Optional[int] = None,
+    shifts: Optional[dict[str, tuple[float, float]]] = None,
+) -> dict[str, PeriodMoments]:
+    """Per-period moments of every level from a single pass over the panel.
+
+    The raw sums n, Σx, Σy, Σxy, Σx², Σy² of the individual regression are
+    accumulated once per quarter; the other two levels follow from them
+    without building their observations:
+
+    - consensus: one observation per non-empty quarter, at the quarter means
+      x̄ = Σx / n and ȳ = Σy / n (or those of `consensus`).
+    - idiosyncratic: the within-quarter demeaned moments, Σ(x - x̄)(y - ȳ) =
+      Σxy - Σx Σy / n and so on, whose first moments vanish.
+
+    Moments cover `periods` quarters from `start` (the span of the panel by
+    default). `shifts` maps levels to `(x_shift, y_shift)` centerings, to
+    accumulate moments that can be added to an existing set; by default
+    the individual and consensus observations are centered on their means
+    and the idiosyncratic ones, whose mean is zero, are not shifted.
+    """
+    shifts = {} if shifts is None else shifts
+    ordinals: np.ndarray = period_ordinals(df["period"])
+    start = int(ordinals.min()) if start is None else start
+    periods = int(ordinals.max()) - start + 1 if periods is None else periods
+    x_column, y_column = LEVELS["individual"]
+    individual: PeriodMoments = PeriodMoments.from_arrays(
+        ordinals=ordinals,
+        x=df[x_column].to_numpy(dtype=float),
+        y=df[y_column].to_numpy(dtype=float),
+        start=start,
+        periods=periods,
+        x_shift=shifts.get("individual", (None, None))[0],
+        y_shift=shifts.get("individual", (None, None))[1],
+    )
+    n, sx, sy = individual.sums[:, :3].T
+    observed: np.ndarray = n > 0
+    count: np.ndarray = np.where(observed, n, 1)
+    # Quarter means, relative to the individual centering
+    mean_x: np.ndarray = sx / count
+    mean_y: np.ndarray = sy / count
+    if consensus is not None:
+        quarter: np.ndarray = period_ordinals(consensus.index) - start
+        inside: np.ndarray = (quarter >= 0) & (quarter < periods)
+        mean_x, mean_y = np.zeros(periods), np.zeros(periods)
+        mean_x[quarter[inside]] = (
+            consensus[LEVELS["consensus"][0]].to_numpy(dtype=float)[inside]
+            - individual.x_shift
+        )
+        mean_y[quarter[inside]] = (
+            consensus[LEVELS["consensus"][1]].to_numpy(dtype=float)[inside]
+            - individual.y_shift
+        )
+    x_shift, y_shift = shifts.get(
+        "consensus",
+        (
+            (
+                individual.x_shift + float(mean_x[observed].mean())
+                if observed.any()
+                else 0.0
+            ),
+            (
+                individual.y_shift + float(mean_y[observed].mean())
+                if observed.any()
+                else 0.0
+            ),
+        ),
+    )
+    ix, iy = shifts.get("idiosyncratic", (0.0, 0.0))
+    consensus_sums, idiosyncratic_sums = quarter_sums(
+        sums=individual.sums,
+        consensus_shift=(x_shift - individual.x_shift, y_shift - individual.y_shift),
+        idiosyncratic_shift=(ix, iy),
+        means=(mean_x, mean_y),
+    )
+    return {
+        "consensus": PeriodMoments(
+            start=start, sums=consensus_sums, x_shift=x_shift, y_shift=y_shift
+        ),
+        "individual": individual,
+        "idiosyncratic": PeriodMoments(
+            start=start, sums=idiosyncratic_sums, x_shift=ix, y_shift=iy
+        ),
+    }
+
+
+def quarter_sums(
+    sums: np.ndarray,
+    consensus_shift: tuple[float, float],
+    idiosyncratic_shift: tuple[float, float] = (0.0, 0.0),
+    means: Optional[tuple[np.ndarray, np.ndarray]] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Consensus and idiosyncratic moments of quarters from their individual moments.
+
+    `sums` (..., 6) are the individual moments of quarters, in the individual
+    centering; `means` the quarter means in that centering (Σx / n and Σy / n
+    by default). The consensus level has one observation (x̄, ȳ) per non-empty
+    quarter, centered on `consensus_shift` relative to the individual
+    centering; the idiosyncratic level has the within-quarter demeaned
+    moments Σ(x - x̄)(y - ȳ) = Σxy - Σx Σy / n and so on, centered on
+    `idiosyncratic_shift`.
+    """
+    n, sx, sy, sxy, sxx, syy = np.moveaxis(sums, -1, 0)
+    observed: np.ndarray = n > 0
+    count: np.ndarray = np.where(observed, n, 1)
+    mean_x, mean_y = (sx / count, sy / count) if means is None else means
+    # Consensus: one observation (x̄, ȳ) per non-empty quarter
+    u: np.ndarray = np.where(observed, mean_x - consensus_shift[0], 0.0)
+    v: np.ndarray = np.where(observed, mean_y - consensus_shift[1], 0.0)
+    consensus: np.ndarray = np.stack(
+        [observed.astype(float), u, v, u * v, u * u, v * v], axis=-1
+    )
+    # Idiosyncratic: moments of the deviations from the quarter means
+    ix, iy = idiosyncratic_shift
+    idiosyncratic: np.ndarray = np.stack(
+        [
+            n,
+            -n * ix,
+            -n * iy,
+            sxy - sx * sy / count + n * ix * iy,
+            sxx - sx * sx / count + n * ix * ix,
+            syy - sy * sy / count + n * iy * iy,
+        ],
+        axis=-1,
+    )
+    return consensus, idiosyncratic
+
+
+def id_moments(df: DataFrame, level: str, moments: PeriodMoments) -> np.ndarray:
+    """Moments of `level` per forecaster and period, (ids, periods, 6).
+
+    Uses the grid and centering shifts of the pooled `moments`, so summing
+    over forecasters gives back `moments.sums`.
+    """
+    ordinals, x, y = level_arrays(df=df, level=level)
+    ids: np.ndarray = np.unique(df["id"].to_numpy(), return_inverse=True)[1]
+    return PeriodMoments.from_arrays(
+        ordinals=ids * moments.periods + ordinals - moments.start,
+        x=x,
+        y=y,
+        start=0,
+        periods=(ids.max() + 1) * moments.periods,
+        x_shift=moments.x_shift,
+        y_shift=moments.y_shift,
+    ).sums.reshape(-1, moments.periods, len(MOMENTS))
+
+
+def window_labels(individual: PeriodMoments, window_size: int) -> Index:
+    """Label every window with the last non-empty quarter it covers."""
+    windows: int = max(individual.periods - window_size, 0)
+    observed: np.ndarray = individual.sums[:, 0] > 0
+    last: np.ndarray = np.maximum.accumulate(
+        np.where(observed, np.arange(individual.periods), -1)
+    )[window_size - 1 : window_size - 1 + windows]
+    return pd.Index(last + individual.start, dtype=np.int64, name="period")
+
+
+def window_beta(moments: dict[str, PeriodMoments], window_size: int) -> DataFrame:
+    """Rolling revision coefficients of every level from precomputed moments."""
+    individual: PeriodMoments = moments["individual"]
+    windows: int = individual.periods - window_size
+    if windows <= 0:
+        return pd.DataFrame(
+            columns=list(LEVELS), index=pd.Index([], dtype=np.int64, name="period")
+        )
+    beta: dict[str, np.ndarray] = {
+        level: ols_slope(level_moment.rolling(window_size=window_size)[:windows])
+        for level, level_moment in moments.items()
+    }
+    return pd.DataFrame(
+        beta, index=window_labels(individual=individual, window_size=window_size)
+    )
+
+
+def rolling_beta(df: DataFrame, window_size: int = WINDOW_SIZE) -> DataFrame:
+    """Consensus, individual and idiosyncratic revision coefficients of every window.
+
+    Windows are `window_size` consecutive quarters starting at every quarter
+    from the first period of the FIRE panel, exactly as `WindowGenerator`
+    iterates them, and each one is labelled with the last period it contains
+    (as an int64 quarter ordinal).
+    """
+    return window_beta(moments=level_moments(df=df), window_size=window_size)
+
+
+def newey_west_lags(window_size: int) -> int:
+    """Bandwidth rule of Newey and West (1994): ⌊4 (T / 100)^(2/9)⌋."""
+    return int(np.floor(4 * (window_size / 100) ** (2 / 9)))
+
+
+def scores(
+    sums: np.ndarray, mean_x: np.ndarray, mean_y: np.ndarray, slope: np.ndarray
+) -> np.ndarray:
+    """Σ (x - x̄) e of the rows behind moment sums (..., 6), given the window fit.
+
+    With e = (y - ȳ) - b (x - x̄) the score expands into raw sums, so the score
+    of any group of rows (a quarter, a forecaster) follows from its moments.
+    """
+    n, sx, sy, sxy, sxx = np.moveaxis(sums, -1, 0)[:5]
+    return (sxy - mean_x * sy - mean_y * sx + n * mean_x * mean_y) - slope * (
+        sxx - 2 * mean_x * sx + n * mean_x * mean_x
+    )
+
+
+def window_inference(
+    df: DataFrame,
+    window_size: int = WINDOW_SIZE,
+    moments: Optional[dict[str, PeriodMoments]] = None,
+    lags: Optional[int] = None,
+    consensus: Optional[DataFrame] = None,
+) -> DataFrame:
+    """Standard errors of the rolling coefficients of every level and window.
+
+    - `{level}_se`: homoskedastic OLS standard error.
+    - `{level}_cluster_se`: clustered by forecaster `id`, with the small-sample
+      factor G/(G-1)·(n-1)/(n-2). The consensus regression has one row per
+      quarter, so its clusters are the quarters (heteroskedasticity-robust).
+    - `{level}_hac_se`: Newey–West with Bartlett weights over `lags` quarters
+      (Newey–West bandwidth rule by default), applied to the per-quarter
+      scores. For the forecaster levels the scores of a quarter are summed
+      first, which makes it the Driscoll–Kraay estimator, with the factor
+      T/(T-1)·(n-1)/(n-2) over the T non-empty quarters as in statsmodels.
+
+    Nothing is refitted: the fit, the per-quarter scores and the per-forecaster
+    scores of every window all come from accumulated moment sums. Rows are the
+    windows of `window_beta`, in the same order and with the same labels.
+    Pass the `consensus` frame of a compact panel when `moments` is not given.
+    """
+    moments = level_moments(df=df, consensus=consensus) if moments is None else moments
+    lags = newey_west_lags(window_size=window_size) if lags is None else lags
+    individual: PeriodMoments = moments["individual"]
+    windows: int = max(individual.periods - window_size, 0)
+    index: Index = window_labels(individual=individual, window_size=window_size)
+    if windows == 0:
+        return pd.DataFrame(
+            columns=[
+                f"{level}_{se}"
+                for level in LEVELS
+                for se in ("se", "cluster_se", "hac_se")
+            ],
+            index=index,
+        )
+    columns: dict[str, np.ndarray] = {}
+    for level, level_moment in moments.items():
+        by_id: Optional[np.ndarray] = None
+        if level != "consensus":
+            by_id = rolling_id_sums(
+                by_period=id_moments(df=df, level=level, moments=level_moment),
+                window_size=window_size,
+                windows=windows,
+            )
+        columns |= standard_errors(
+            level=level,
+            totals=level_moment.rolling(window_size=window_size)[:windows],
+            quarters=window_quarters(
+                sums=level_moment.sums, window_size=window_size, windows=windows
+            ),
+            by_id=by_id,
+            lags=lags,
+        )
+    return pd.DataFrame(columns, index=index)
+
+
+def window_quarters(sums: np.ndarray, window_size: int, windows: int) -> np.ndarray:
+    """Per-quarter moments (..., periods, 6) of every window, (..., windows, window_size, 6).
+
+    A strided view: nothing is copied.
+    """
+    return np.swapaxes(
+        np.lib.stride_tricks.sliding_window_view(
+            sums, window_shape=window_size, axis=-2
+        )[..., :windows, :, :],
+        -1,
+        -2,
+    )
+
+
+def rolling_id_sums(
+    by_period: np.ndarray, window_size: int, windows: int
+) -> np.ndarray:
+    """Moments per forecaster and window, (ids, windows, 6), from (ids, periods, 6)."""
+    cumsum: np.ndarray = np.concatenate(
+        [np.zeros_like(by_period[:, :1]), np.cumsum(by_period, axis=1)], axis=1
+    )
+    return (cumsum[:, window_size:] - cumsum[:, :-window_size])[:, :windows]
+
+
+def standard_errors(
+    level: str,
+    totals: np.ndarray,
+    quarters: np.ndarray,
+    by_id: Optional[np.ndarray],
+    lags: int,
+) -> dict[str, np.ndarray]:
+    """Plain, clustered and HAC standard errors of one level in every window.
+
+    `totals` (windows, 6) are the moments of each window, `quarters`
+    (windows, window_size, 6) those of its quarters and `by_id`
+    (ids, windows, 6) those of its forecasters (`None` for the consensus,
+    clustered by quarter). See `window_inference`.
+    """
+    n, sx, sy, sxy, sxx, syy = totals.T
+    columns: dict[str, np.ndarray] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x, mean_y = sx / n, sy / n
+        cxx, cxy, cyy = sxx - sx * mean_x, sxy - sx * mean_y, syy - sy * mean_y
+        slope: np.ndarray = cxy / cxx
+        columns[f"{level}_se"] = np.sqrt((cyy - slope * cxy) / (n - 2) / cxx)
+        fit: tuple[np.ndarray, ...] = (
+            mean_x[:, None],
+            mean_y[:, None],
+            slope[:, None],
+        )
+        by_quarter: np.ndarray = scores(quarters, *fit)
+        if by_id is None:
+            meat: np.ndarray = (by_quarter**2).sum(axis=1)
+            clusters: np.ndarray = (quarters[:, :, 0] > 0).sum(axis=1)
+        else:
+            meat = (scores(by_id, *(value[:, 0] for value in fit)) ** 2).sum(axis=0)
+            clusters = (by_id[:, :, 0] > 0).sum(axis=0)
+        columns[f"{level}_cluster_se"] = (
+            np.sqrt(clusters / (clusters - 1) * (n - 1) / (n - 2) * meat) / cxx
+        )
+        hac: np.ndarray = (by_quarter**2).sum(axis=1)
+        for lag in range(1, lags + 1):
+            hac += (
+                2
+                * (1 - lag / (lags + 1))
+                * (by_quarter[:, lag:] * by_quarter[:, :-lag]).sum(axis=1)
+            )
+        if by_id is not None:
+            periods: np.ndarray = (quarters[:, :, 0] > 0).sum(axis=1)
+            hac *= periods / (periods - 1) * (n - 1) / (n - 2)
+        columns[f"{level}_hac_se"] = np.sqrt(hac) / cxx
+    return columns
+
+
+def eligibility(
+    df: DataFrame,
+    window_size: int = WINDOW_SIZE,
+    minimize_counts: int = 10,
+    rule: Literal["global", "window"] = "window",
+) -> np.ndarray:
+    """Whether each forecaster enters the regressions of each window, (ids, windows).
+
+    Forecasters are in sorted `id` order and windows as in `window_beta`.
+    With `rule="global"` a forecaster needs `minimize_counts` observations
+    over the whole panel (the rule of `filter_id`), with `rule="window"`
+    that many inside the window. Both come from one bincount of the
+    observations per forecaster and quarter and its cumulative sums.
+    """
+    ordinals: np.ndarray = period_ordinals(df["period"])
+    start: int = int(ordinals.min())
+    periods: int = int(ordinals.max()) - start + 1
+    windows: int = max(periods - window_size, 0)
+    ids: np.ndarray = np.unique(df["id"].to_numpy(), return_inverse=True)[1]
+    counts: np.ndarray = np.bincount(
+        ids * periods + ordinals - start, minlength=(ids.max() + 1) * periods
+    ).reshape(-1, periods)
+    if rule == "global":
+        return np.repeat(
+            counts.sum(axis=1)[:, None] >= minimize_counts, windows, axis=1
+        )
+    elif rule == "window":
+        return (
+            rolling_id_sums(
+                by_period=counts[:, :, None], window_size=window_size, windows=windows
+            )[:, :, 0]
+            >= minimize_counts
+        )
+    raise ValueError("rule must be 'global' or 'window'")
+
+
+def eligible_window_beta(
+    df: DataFrame,
+    window_size: int = WINDOW_SIZE,
+    minimize_counts: int = 10,
+    rule: Literal["global", "window"] = "window",
+    lags: Optional[int] = None,
+) -> DataFrame:
+    """Coefficients and standard errors of every window, filtering forecasters per window.
+
+    Only the forecasters marked by `eligibility` enter a window, at every
+    level: the consensus means and idiosyncratic deviations of its quarters
+    are those of the eligible forecasters. The mask is applied to the
+    per-forecaster moments, so no frame is filtered; the moments of the
+    quarters of every window are contracted from strided views of them.
+    Use it on a panel built without `filter_id` (`minimize_counts=1`).
+    Columns are those of `window_beta` and `window_inference`, on the same
+    windows.
+    """
+    lags = newey_west_lags(window_size=window_size) if lags is None else lags
+    moments: dict[str, PeriodMoments] = level_moments(df=df)
+    individual: PeriodMoments = moments["individual"]
+    eligible: np.ndarray = eligibility(
+        df=df, window_size=window_size, minimize_counts=minimize_counts, rule=rule
+    ).astype(float)
+    windows: int = eligible.shape[1]
+    index: Index = window_labels(individual=individual, window_size=window_size)
+    if windows == 0:
+        return pd.concat(
+            [
+                window_beta(moments=moments, window_size=window_size),
+                window_inference(df=df, window_size=window_size, moments=moments),
+            ],
+            axis=1,
+        )
+    # Moments per forecaster and quarter, and their quarters in every window
+    by_period: np.ndarray = id_moments(df=df, level="individual", moments=individual)
+    views: np.ndarray = window_quarters(
+        sums=by_period, window_size=window_size, windows=windows
+    )
+    # (windows, window_size, 6), summed over the eligible forecasters
+    quarters: dict[str, np.ndarray] = {
+        "individual": np.einsum("iw,iwtk->wtk", eligible, views)
+    }
+    quarters["consensus"], quarters["idiosyncratic"] = quarter_sums(
+        sums=quarters["individual"],
+        consensus_shift=(
+            moments["consensus"].x_shift - individual.x_shift,
+            moments["consensus"].y_shift - individual.y_shift,
+        ),
+    )
+    by_id: dict[str, np.ndarray] = {
+        "individual": rolling_id_sums(
+            by_period=by_period, window_size=window_size, windows=windows
+        )
+        * eligible[:, :, None]
+    }
+    # Idiosyncratic moments of every forecaster: deviations from the quarter
+    # means of the window, Σ(x - x̄)(y - ȳ) = Σxy - x̄ Σy - ȳ Σx + n x̄ ȳ and so on
+    n, sx, sy = (views[..., k] for k in range(3))
+    count: np.ndarray = np.maximum(quarters["individual"][..., 0], 1)
+    mean_x: np.ndarray = quarters["individual"][..., 1] / count
+    mean_y: np.ndarray = quarters["individual"][..., 2] / count
+    total_n, total_x, total_y, total_xy, total_xx, total_yy = np.moveaxis(
+        by_id["individual"], -1, 0
+    )
+
+    def contract(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        return np.einsum("iwt,wt->iw", values, weights) * eligible
+
+    by_id["idiosyncratic"] = np.stack(
+        [
+            total_n,
+            total_x - contract(n, mean_x),
+            total_y - contract(n, mean_y),
+            total_xy
+            - contract(sy, mean_x)
+            - contract(sx, mean_y)
+            + contract(n, mean_x * mean_y),
+            total_xx - 2 * contract(sx, mean_x) + contract(n, mean_x * mean_x),
+            total_yy - 2 * contract(sy, mean_y) + contract(n, mean_y * mean_y),
+        ],
+        axis=-1,
+    )
+    columns: dict[str, np.ndarray] = {}
+    for level in LEVELS:
+        totals: np.ndarray = quarters[level].sum(axis=1)
+        columns[level] = ols_slope(totals)
+        columns |= standard_errors(
+            level=level,
+            totals=totals,
+            quarters=quarters[level],
+            by_id=by_id.get(level),
+            lags=lags,
+        )
+    df_beta: DataFrame = pd.DataFrame(columns, index=index)
+    return df_beta[
+        list(LEVELS)
+        + [f"{level}_{se}" for level in LEVELS for se in ("se", "cluster_se", "hac_se")]
+    ]
+
+
+def weight_on_idiosyncratic(df_beta: DataFrame) -> Series:
+    """Weight on idiosyncratic information implied by the three coefficients."""
+    return (df_beta["individual"] - df_beta["consensus"]) / (
+        df_beta["idiosyncratic"] - df_beta["consensus"]
+    )
+
+
+if __name__ == "__main__":
+    ...
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from functools import partial
+
+from src.constants import *
+from src.reg.fire import cached_compact_panel, cached_panel
+from src.reg.rolling import level_moments, weight_on_idiosyncratic, window_beta
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Long format of a sweep
+COLUMNS: list[str] = [
+    "variable",
+    "forecast_horizon",
+    "window_size",
+    "period",
+    "series",
+    "value",
+]
+
+
+def sweep_variable(
+    column: str,
+    forecast_horizons: Sequence[int] = (1, 2, 3, 4),
+    window_sizes: Sequence[int] = (WINDOW_SIZE,),
+    compact: bool = False,
+) -> DataFrame:
+    """Rolling coefficients and weights of one variable over a horizon × window grid.
+
+    The survey and vintage files are parsed once per process and shared by
+    every horizon, and all window sizes of a horizon are rolled over the same
+    per-period moment arrays. Rate variables have no horizon, so their single
+    panel is reported under every requested horizon. With `compact=True` the
+    panels are held as `compact_panel` does.
+    """
+    frames: list[DataFrame] = []
+    moments: Optional[dict] = None
+    for forecast_horizon in forecast_horizons:
+        if moments is None or VARIABLE[column]["type"] != "rate":
+            if compact:
+                panel, consensus = cached_compact_panel(
+                    column=column, forecast_horizon=forecast_horizon
+                )
+                moments = level_moments(df=panel, consensus=consensus)
+            else:
+                panel: DataFrame = cached_panel(
+                    column=column, forecast_horizon=forecast_horizon
+                )
+                moments = level_moments(df=panel)
+        for window_size in window_sizes:
+            df_beta: DataFrame = window_beta(moments=moments, window_size=window_size)
+            df_beta["weight"] = weight_on_idiosyncratic(df_beta=df_beta)
+            frames.append(
+                df_beta.reset_index()
+                .melt(id_vars="period", var_name="series", value_name="value")
+                .assign(forecast_horizon=forecast_horizon, window_size=window_size)
+            )
+    if not frames:
+        # Empty grid
+        return pd.DataFrame(columns=COLUMNS)
+    return (
+        pd.concat(frames, ignore_index=True).pipe(with_periods).assign(variable=column)
+    )
+
+
+def sweep(
+    variables: Optional[Sequence[str]] = None,
+    forecast_horizons: Sequence[int] = (1, 2, 3, 4),
+    window_sizes: Sequence[int] = (WINDOW_SIZE,),
+    workers: Optional[int] = 1,
+    compact: bool = False,
+) -> DataFrame:
+    """Sweep variables × forecast horizons × window sizes into one tidy frame.
+
+    Columns: `variable`, `forecast_horizon`, `window_size`, `period`, `series`
+    (consensus, individual, idiosyncratic or weight) and `value`. Variables
+    are spread across `workers` processes; `compact` as in `sweep_variable`.
+    An empty grid gives an empty frame with these columns.
+    """
+    variables = list(VARIABLE) if variables is None else list(variables)
+    frames: list[DataFrame] = parallel_map(
+        func=partial(
+            sweep_variable,
+            forecast_horizons=forecast_horizons,
+            window_sizes=window_sizes,
+            compact=compact,
+        ),
+        items=variables,
+        workers=workers,
+        description="Sweep",
+    )
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)[COLUMNS]
+
+
+if __name__ == "__main__":
+    df: DataFrame = sweep(window_sizes=[40, 60, 80], workers=None)
+    pp(df)
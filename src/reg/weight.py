@@ -14,9 +14,20 @@ from src.data.real import (
     RealQuarterlyMonthly,
 )
 from src.data.uncertainty import SCL, Uncertainty
-from src.reg.fire import Fire
+from src.reg.fire import Fire, expand_panel
+from src.reg.rolling import (
+    LEVELS,
+    PeriodMoments,
+    StreamingOLS,
+    eligible_window_beta,
+    level_moments,
+    weight_on_idiosyncratic,
+    window_beta,
+    window_inference,
+)
 from src.settings import ProjectPath
 from src.utils.imports import *
+from src.utils.instrument import stage
 from src.utils.utils import *
 
 
@@ -24,31 +35,50 @@ from src.utils.utils import *
 class WindowGenerator(object):
     df: DataFrame
     window_size: int = 80
+    ranges: bool = False  # yield `(start, stop)` row offsets instead of `Window`s
 
     def __post_init__(self) -> None:
+        # Sort once so that every window is a contiguous block of rows
+        self.df = self.df.sort_values(by="period", kind="stable")
         self.period_list = self.df["period"].unique()
         self.start_period = self.period_list[0]
         self._end_period = self.period_list[-1]
+        # Row offsets of the windows starting at every quarter
+        ordinals: np.ndarray = period_ordinals(self.df["period"])
+        starts: np.ndarray = np.arange(ordinals[0], ordinals[-1] - self.window_size + 1)
+        self.offsets: np.ndarray = np.column_stack(
+            [
+                np.searchsorted(ordinals, starts, side="left"),
+                np.searchsorted(ordinals, starts + self.window_size, side="left"),
+            ]
+        )
+
+    def steps(self):
+        """Row ranges entering and leaving the window at every step.
+
+        Yields `((enter_start, enter_stop), (leave_start, leave_stop))`; the first
+        step enters the whole first window and leaves nothing.
+        """
+        previous_start, previous_stop = self.offsets[0][0], self.offsets[0][0]
+        for start, stop in self.offsets:
+            yield (int(previous_stop), int(stop)), (int(previous_start), int(start))
+            previous_start, previous_stop = start, stop
+
+    def __len__(self) -> int:
+        return len(self.offsets)
 
     def __iter__(self):
-        self._period = self.start_period
+        self._index = 0
         return self
 
     def __next__(self):
-        if self._period > self._end_period - self.window_size:
+        if self._index >= len(self.offsets):
             raise StopIteration
-        self._period += 1
-        return Window(
-            df=self.df[
-                self.df["period"].isin(
-                    pd.period_range(
-                        start=self._period - 1,
-                        periods=self.window_size,
-                        freq="Q-DEC",
-                    )
-                )
-            ]
-        )
+        start, stop = self.offsets[self._index]
+        self._index += 1
+        if self.ranges:
+            return int(start), int(stop)
+        return Window(df=self.df.iloc[start:stop])
 
 
 @dataclass
@@ -58,7 +88,8 @@ class Window(object):
     def __post_init__(self) -> None: ...
 
     def __repr__(self) -> str:
-        return f"Window from {self.df['period'].min()} to {self.df['period'].max()}"
+        start, end = ordinals_to_period(self.df["period"].agg(["min", "max"]))
+        return f"Window from {start} to {end}"
 
     def get_individual(self) -> DataFrame:
         return self.df[["period", "id", "error", "revision"]].set_index(
@@ -73,58 +104,196 @@ class Window(object):
         )
 
     def get_consensus(self) -> DataFrame:
-        return (
-            self.df[["period", "error_mean", "revision_mean"]]
-            .drop_duplicates(subset=["period", "error_mean", "revision_mean"])
-            .rename(columns={"error_mean": "error", "revision_mean": "revision"})
-            .set_index(["period"])
-        )
+        return self.df.groupby("period")[["error", "revision"]].mean()
 
     @property
     def beta(self) -> dict[str, float]:
+        return self.get_beta()
+
+    def get_beta(self, summary: bool = False) -> dict[str, float]:
+        """Fit the three revision coefficients with statsmodels."""
         return {
             "period": self.df["period"].max(),
-            "consensus": revision_coefficient(self.get_consensus()),
-            "individual": revision_coefficient(self.get_individual()),
-            "idiosyncratic": revision_coefficient(self.get_idiosyncratic()),
+            "consensus": revision_coefficient(self.get_consensus(), summary=summary),
+            "individual": revision_coefficient(self.get_individual(), summary=summary),
+            "idiosyncratic": revision_coefficient(
+                self.get_idiosyncratic(), summary=summary
+            ),
         }
 
 
+def streaming_beta(df: DataFrame, window_size: int = 80) -> DataFrame:
+    """Rolling betas from `StreamingOLS` regressions slid over the sorted panel.
+
+    Each step only adds the rows of the quarter entering the window and
+    removes those of the quarter leaving it, in constant memory per level.
+    """
+    consensus: DataFrame = df.sort_values(by="period", kind="stable").drop_duplicates(
+        subset="period"
+    )
+    generators: dict[str, WindowGenerator] = {
+        "consensus": WindowGenerator(df=consensus, window_size=window_size),
+        "individual": WindowGenerator(df=df, window_size=window_size),
+    }
+    generators["idiosyncratic"] = generators["individual"]
+    rows: list[dict[str, Any]] = []
+    regressions: dict[str, StreamingOLS] = {level: StreamingOLS() for level in LEVELS}
+    steps = {level: generators[level].steps() for level in LEVELS}
+    columns = {
+        level: (
+            generators[level].df[LEVELS[level][0]].to_numpy(dtype=float),
+            generators[level].df[LEVELS[level][1]].to_numpy(dtype=float),
+        )
+        for level in LEVELS
+    }
+    periods: Series = generators["individual"].df["period"]
+    for _ in range(len(generators["individual"])):
+        row: dict[str, Any] = {}
+        for level, regression in regressions.items():
+            (enter_start, enter_stop), (leave_start, leave_stop) = next(steps[level])
+            x, y = columns[level]
+            regression.add(x=x[enter_start:enter_stop], y=y[enter_start:enter_stop])
+            regression.remove(x=x[leave_start:leave_stop], y=y[leave_start:leave_stop])
+            row[level] = regression.slope
+            if level == "individual":
+                row["period"] = periods.iloc[enter_stop - 1]
+        rows.append(row)
+    if not rows:
+        # Fewer quarters than `window_size`, as in `window_beta`
+        return pd.DataFrame(
+            columns=list(LEVELS), index=pd.Index([], dtype=np.int64, name="period")
+        )
+    return pd.DataFrame(rows).set_index("period")[list(LEVELS)]
+
+
 @dataclass
 class Beta:
     fire: Fire
     window_size: int = 80
+    summary: bool = False  # refit every window with statsmodels and print it
+    streaming: bool = False  # slide add/remove regressions instead of moment sums
+    # Observations a forecaster needs inside a window to enter it (`None`: only
+    # the global `filter_id` of the panel); see `eligible_window_beta`
+    window_counts: Optional[int] = None
 
     def __post_init__(self) -> None:
-        self.df_beta: DataFrame = pd.DataFrame(
-            [
-                window.beta
-                for window in WindowGenerator(
-                    df=self.fire.df, window_size=self.window_size
+        if self.window_counts is not None and (self.summary or self.streaming):
+            raise ValueError("window_counts needs the closed-form estimator!")
+        if self.window_counts is None:
+            with stage("beta.rolling", variable=self.fire.column) as record:
+                # Per-quarter moment sums, behind the closed-form estimator and
+                # the standard errors of every estimator
+                moments: dict[str, PeriodMoments] = level_moments(
+                    df=self.fire.df, consensus=self.fire.consensus
                 )
-            ]
-        ).set_index("period")
-        self.df_beta["weight"] = (
-            self.df_beta["individual"] - self.df_beta["consensus"]
-        ) / (self.df_beta["idiosyncratic"] - self.df_beta["consensus"])
-        self.df_beta = pd.merge(
-            left=self.df_beta,
-            right=Uncertainty().df,
-            how="left",
-            left_index=True,
-            right_index=True,
-        )
-        self.df_beta["weight_change"] = self.df_beta["weight"].diff()
-        self.df_beta["weight_change_rate"] = (
-            self.df_beta["weight_change"] / self.df_beta["weight"].shift(1)
-        ) * 100
-
-    def save(self) -> None:
-        self.df_beta.to_csv(
-            path_or_buf=f"{ProjectPath.beta_reg}/{self.fire.name}.csv",
-            index=True,
-        )
-        pp(f"{self.fire.column} beta data saved successfully!")
+                self.df_beta: DataFrame = self.rolling(
+                    moments=None if self.summary or self.streaming else moments
+                )
+                record.rows = len(self.df_beta)
+            # Plain, clustered-by-id and HAC standard errors of every coefficient
+            with stage("beta.inference", variable=self.fire.column):
+                df_se: DataFrame = window_inference(
+                    df=self.fire.df, window_size=self.window_size, moments=moments
+                )
+        else:
+            # The eligibility estimator brings its own standard errors
+            with stage("beta.rolling", variable=self.fire.column) as record:
+                df_window: DataFrame = eligible_window_beta(
+                    df=self.fire.df,
+                    window_size=self.window_size,
+                    minimize_counts=self.window_counts,
+                )
+                self.df_beta = df_window[list(LEVELS)].copy()
+                record.rows = len(self.df_beta)
+            df_se = df_window.drop(columns=list(LEVELS))
+        with stage("beta.merge", variable=self.fire.column):
+            self.df_beta["weight"] = weight_on_idiosyncratic(df_beta=self.df_beta)
+            self.df_beta = pd.merge(
+                left=self.df_beta,
+                right=Uncertainty().df,
+                how="left",
+                left_index=True,
+                right_index=True,
+            )
+            self.df_beta["weight_change"] = self.df_beta["weight"].diff()
+            self.df_beta["weight_change_rate"] = (
+                self.df_beta["weight_change"] / self.df_beta["weight"].shift(1)
+            ) * 100
+        self.df_beta[df_se.columns] = df_se.to_numpy()
+        # Quarter ordinals become `Period` only in the output
+        self.df_beta.index = ordinals_to_period(self.df_beta.index).rename("period")
+
+    def rolling(self, moments: Optional[dict[str, PeriodMoments]] = None) -> DataFrame:
+        """Coefficients of every window with the estimator selected by the flags.
+
+        Only the closed-form estimator uses `moments` (of `level_moments`),
+        computed from the panel when not given.
+        """
+        if self.summary:
+            return pd.DataFrame(
+                [
+                    window.get_beta(summary=True)
+                    for window in WindowGenerator(
+                        df=expand_panel(df=self.fire.df, consensus=self.fire.consensus),
+                        window_size=self.window_size,
+                    )
+                ]
+            ).set_index("period")
+        elif self.streaming:
+            return streaming_beta(
+                df=expand_panel(df=self.fire.df, consensus=self.fire.consensus),
+                window_size=self.window_size,
+            )
+        # Closed-form rolling OLS from per-period moment sums
+        if moments is None:
+            moments = level_moments(df=self.fire.df, consensus=self.fire.consensus)
+        return window_beta(moments=moments, window_size=self.window_size)
+
+    def save(self, verbose: bool = True) -> None:
+        with stage("beta.save", variable=self.fire.column) as record:
+            self.df_beta.to_csv(
+                path_or_buf=f"{ProjectPath.beta_reg}/{self.fire.name}.csv",
+                index=True,
+            )
+            record.rows = len(self.df_beta)
+        if verbose:
+            pp(f"{self.fire.column} beta data saved successfully!")
+
+
+def compact_precision(
+    column: str, forecast_horizon: int = 4, window_size: int = 80
+) -> DataFrame:
+    """Largest differences between the results of a compact and a float64 panel.
+
+    Rows are the coefficients, the weight and the standard errors; columns
+    the largest absolute difference over the windows and the largest one
+    relative to the float64 value. Only the float32 storage of the
+    forecaster errors and revisions differs (about 7 significant digits,
+    sums are still accumulated in float64). On the synthetic benchmark data
+    the coefficients agree to about 1e-8 and the standard errors to about
+    5e-8 relative. The weight, a ratio of differences of coefficients, is
+    the least precise (about 2e-5 relative), and its quarterly changes more
+    so: check it where the idiosyncratic and consensus coefficients are close.
+    """
+    frames: list[DataFrame] = [
+        Beta(
+            fire=Fire(
+                column=column,
+                forecast_horizon=forecast_horizon,
+                cache=True,
+                compact=compact,
+            ),
+            window_size=window_size,
+        ).df_beta.drop(columns=Uncertainty().df.columns)
+        for compact in (False, True)
+    ]
+    difference: DataFrame = (frames[1] - frames[0]).abs()
+    return pd.DataFrame(
+        {
+            "absolute": difference.max(),
+            "relative": (difference / frames[0].abs()).max(),
+        }
+    )
 
 
 if __name__ == "__main__":
@@ -133,7 +302,7 @@ if __name__ == "__main__":
     # beta.save()
     ...
     for variable, info in VARIABLE.items():
-        fire = Fire(column=variable)
+        fire = Fire(column=variable, cache=True)
         beta = Beta(fire=fire)
         beta.save()
     # break
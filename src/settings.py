@@ -6,6 +6,7 @@ class ProjectPath:
     individual_reg: str = f"{derived}/individual"
     consensus_reg: str = f"{derived}/consensus"
     beta_reg: str = f"{derived}/beta"
+    bootstrap_reg: str = f"{derived}/bootstrap"
 
     survey: str = f"{raw}/Survey"
     # individual: str = f"{survey}/Individual"
@@ -15,3 +16,9 @@ class ProjectPath:
 
     # & Cache
     cache: str = "cache"
+
+    # & Figures
+    figure: str = "figures"
+
+    # & Benchmarks
+    bench: str = "benchmarks"
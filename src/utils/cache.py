@@ -0,0 +1,113 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import hashlib
+
+from src.settings import ProjectPath
+from src.utils.imports import *
+
+# Name of the column holding the frame index inside a cache file
+INDEX_COLUMN: str = "__index__"
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_frame(df: DataFrame) -> tuple[DataFrame, Info]:
+    """Flatten `Period` index, columns and values into int64 ordinals for storage."""
+    meta: Info = {
+        "index_name": df.index.name,
+        "index_freq": None,
+        "columns_freq": None,
+        "period_columns": {},
+    }
+    df = df.copy()
+    if isinstance(df.columns, PeriodIndex):
+        meta["columns_freq"] = df.columns.freqstr
+        df.columns = df.columns.asi8.astype(str)
+    if isinstance(df.index, PeriodIndex):
+        meta["index_freq"] = df.index.freqstr
+        df.index = df.index.asi8
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.PeriodDtype):
+            meta["period_columns"][column] = df[column].array.freqstr
+            df[column] = df[column].array.asi8
+    df.index.name = INDEX_COLUMN
+    return df.reset_index(), meta
+
+
+def decode_frame(df: DataFrame, meta: Info) -> DataFrame:
+    """Inverse of `encode_frame`, rebuilding `Period` objects with vectorized constructors."""
+    df = df.set_index(INDEX_COLUMN)
+    for column, freq in meta["period_columns"].items():
+        df[column] = pd.PeriodIndex.from_ordinals(df[column], freq=freq)
+    if meta["index_freq"] is not None:
+        df.index = pd.PeriodIndex.from_ordinals(df.index, freq=meta["index_freq"])
+    if meta["columns_freq"] is not None:
+        df.columns = pd.PeriodIndex.from_ordinals(
+            df.columns.astype(np.int64), freq=meta["columns_freq"]
+        )
+    df.index.name = meta["index_name"]
+    return df
+
+
+def fingerprint(sources: Sequence[str]) -> str:
+    """SHA-256 over the content hashes of several files."""
+    if len(sources) == 1:
+        return file_hash(path=sources[0])
+    return hashlib.sha256(
+        "".join(file_hash(path=source) for source in sources).encode()
+    ).hexdigest()
+
+
+def cached_frame(
+    name: str,
+    source: str | Sequence[str],
+    loader: Callable[[], DataFrame],
+    version: int = 0,
+) -> DataFrame:
+    """Load a typed frame through a Feather file in `ProjectPath.cache`.
+
+    On first use the frame built by `loader` is written to `cache/{name}.feather`
+    together with the SHA-256 of `source` (one file or several). Later loads
+    memory-map the Feather file, unless the fingerprint of `source` has
+    changed, in which case the frame is rebuilt. Bump `version` whenever
+    `loader` changes what it returns. Without `pyarrow` the cache is skipped
+    and `loader` is called.
+    """
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return loader()
+    path: str = f"{ProjectPath.cache}/{name}"
+    digest: str = fingerprint(sources=[source] if isinstance(source, str) else source)
+    if os.path.exists(f"{path}.json") and os.path.exists(f"{path}.feather"):
+        with open(f"{path}.json") as file:
+            meta: Info = json.load(file)
+        if meta.get("sha256") == digest and meta.get("version", 0) == version:
+            table = feather.read_table(f"{path}.feather", memory_map=True)
+            return decode_frame(df=table.to_pandas(), meta=meta)
+    df: DataFrame = loader()
+    encoded, meta = encode_frame(df=df)
+    meta.update(source=source, sha256=digest, version=version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to temporary files first so concurrent readers never see a partial cache
+    temporary: str = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(encoded, temporary, compression="uncompressed")
+    os.replace(temporary, f"{path}.feather")
+    with open(temporary, "w") as file:
+        json.dump(meta, file)
+    os.replace(temporary, f"{path}.json")
+    return df
+
+
+if __name__ == "__main__":
+    ...
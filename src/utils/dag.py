@@ -0,0 +1,183 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+from dataclasses import field
+
+from src.settings import ProjectPath
+from src.utils.cache import file_hash
+from src.utils.imports import *
+from src.utils.utils import *
+
+# Bump to rebuild every node, e.g. when the record format changes
+DAG_VERSION: int = 0
+
+
+@dataclass
+class Node(object):
+    """One build step: `task(**kwargs)` reads the files `inputs` and writes `outputs`.
+
+    A node depends on the nodes whose outputs are among its inputs, and runs
+    after the nodes named in `after` (order-only prerequisites, as in make:
+    they never make it stale). It is stale when an input changed content,
+    when `params` changed, or when one of its outputs is missing or was
+    modified since it was built. `params` must be JSON-serializable; `task`
+    and `kwargs` must be picklable to run in worker processes.
+    """
+
+    name: str
+    task: Callable[..., Any]
+    inputs: list[str]
+    outputs: list[str]
+    kwargs: Info = field(default_factory=dict)
+    params: Info = field(default_factory=dict)
+    after: list[str] = field(default_factory=list)
+
+    @property
+    def record_path(self) -> str:
+        return f"{ProjectPath.cache}/dag/{self.name.replace('/', '_')}.json"
+
+
+def file_stamp(path: str) -> list[int]:
+    """Size and modification time of a file, to skip hashing unchanged files."""
+    stat: os.stat_result = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def input_hashes(paths: Sequence[str], previous: dict[str, list]) -> dict[str, list]:
+    """Stamp and SHA-256 of every input, hashing only files whose stamp moved.
+
+    `previous` maps paths to the `[size, mtime_ns, sha256]` of the last build.
+    """
+    hashes: dict[str, list] = {}
+    for path in paths:
+        stamp: list[int] = file_stamp(path=path)
+        known: Optional[list] = previous.get(path)
+        hashes[path] = stamp + [
+            known[2] if known and known[:2] == stamp else file_hash(path=path)
+        ]
+    return hashes
+
+
+def contents(hashes: dict[str, list]) -> dict[str, str]:
+    """SHA-256 of every file of `input_hashes`, without the stamps."""
+    return {path: entry[2] for path, entry in hashes.items()}
+
+
+def read_record(node: Node) -> Info:
+    if not os.path.exists(node.record_path):
+        return {}
+    with open(node.record_path) as file:
+        return json.load(file)
+
+
+def write_record(node: Node, record: Info) -> None:
+    os.makedirs(os.path.dirname(node.record_path), exist_ok=True)
+    temporary: str = f"{node.record_path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(record, file)
+    os.replace(temporary, node.record_path)
+
+
+def node_state(node: Node) -> tuple[bool, Info]:
+    """Whether `node` is stale, and its record with the current input hashes.
+
+    Inputs whose stamp moved but whose content did not only refresh the
+    record, so touching a file never triggers a rebuild.
+    """
+    record: Info = read_record(node=node)
+    inputs: dict[str, list] = input_hashes(
+        paths=node.inputs, previous=record.get("inputs", {})
+    )
+    outputs: dict[str, list] = record.get("outputs", {})
+    stale: bool = (
+        record.get("version") != DAG_VERSION
+        or record.get("params") != node.params
+        or contents(hashes=record.get("inputs", {})) != contents(hashes=inputs)
+        or sorted(outputs) != sorted(node.outputs)
+        or any(
+            not os.path.exists(path) or file_stamp(path=path) != stamp
+            for path, stamp in outputs.items()
+        )
+    )
+    if not stale and inputs != record["inputs"]:
+        record["inputs"] = inputs
+        write_record(node=node, record=record)
+    return stale, {"version": DAG_VERSION, "params": node.params, "inputs": inputs}
+
+
+def build_node(item: tuple[Node, Info]) -> str:
+    """Run a stale node and record what it was built from."""
+    node, record = item
+    for path in node.outputs:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    node.task(**node.kwargs)
+    missing: list[str] = [path for path in node.outputs if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"{node.name} did not write {missing}!")
+    write_record(
+        node=node,
+        record=record
+        | {"outputs": {path: file_stamp(path=path) for path in node.outputs}},
+    )
+    return node.name
+
+
+def topological_waves(nodes: Sequence[Node]) -> list[list[Node]]:
+    """Group the nodes into waves whose dependencies all lie in earlier waves."""
+    names: set[str] = {node.name for node in nodes}
+    producer: dict[str, str] = {
+        path: node.name for node in nodes for path in node.outputs
+    }
+    dependencies: dict[str, set[str]] = {
+        node.name: (
+            {producer[path] for path in node.inputs if path in producer}
+            | set(node.after)
+        )
+        & names - {node.name}
+        for node in nodes
+    }
+    waves: list[list[Node]] = []
+    done: set[str] = set()
+    remaining: list[Node] = list(nodes)
+    while remaining:
+        wave: list[Node] = [
+            node for node in remaining if dependencies[node.name] <= done
+        ]
+        if not wave:
+            raise ValueError(
+                f"Cycle among {[node.name for node in remaining]} in the DAG!"
+            )
+        waves.append(wave)
+        done |= {node.name for node in wave}
+        remaining = [node for node in remaining if node.name not in done]
+    return waves
+
+
+def run_dag(
+    nodes: Sequence[Node], workers: Optional[int] = None, force: bool = False
+) -> list[str]:
+    """Rebuild the stale nodes of the DAG, wave by wave, and return their names.
+
+    Staleness is judged just before each wave, once the nodes it depends on
+    are rebuilt: a node whose rebuilt inputs came out byte-identical is
+    skipped. The stale nodes of a wave run across `workers` processes (all
+    cores by default). `force=True` rebuilds every node.
+    """
+    built: list[str] = []
+    for wave in topological_waves(nodes=nodes):
+        stale: list[tuple[Node, Info]] = []
+        for node in wave:
+            is_stale, record = node_state(node=node)
+            if force or is_stale:
+                stale.append((node, record))
+        if stale:
+            built += parallel_map(
+                func=build_node, items=stale, workers=workers, description="Build"
+            )
+    return built
+
+
+if __name__ == "__main__":
+    ...
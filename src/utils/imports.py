@@ -20,10 +20,8 @@ from typing import (
     Union,
 )
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 
 # from flatdict import FlatDict
 # from numpy import float32, float64
@@ -38,17 +36,6 @@ from pandas import (
     Timestamp,
 )
 from pandas.arrays import PeriodArray
-from rich import print as ic
-from rich.panel import Panel
-from rich.pretty import Pretty, pprint
-from rich.progress import (
-    BarColumn,
-    Progress,
-    TaskID,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
-)
 
 # from scipy import stats
 # from scipy.linalg import toeplitz
@@ -66,13 +53,29 @@ Parameters = dict[str, float]
 
 def pp(_object: Any) -> None:
     """Pretty print an object in a panel using the rich library"""
+    from rich import print as ic
+    from rich.panel import Panel
+    from rich.pretty import Pretty
+
     ic(Panel(Pretty(_object, expand_all=True), expand=False, subtitle_align="center"))
 
 
-def progress(iterable, description="Working"):
-    """A generator that yields items from an iterable and updates a progress bar."""
+def progress(iterable, description="Working", total: Optional[int] = None):
+    """A generator that yields items from an iterable and updates a progress bar.
+
+    `total` is required when the iterable has no length (e.g. `as_completed`).
+    """
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        TaskID,
+        TextColumn,
+        TimeElapsedColumn,
+        TimeRemainingColumn,
+    )
+
     # Get the total number of items in the iterable
-    total: int = len(iterable)
+    total = len(iterable) if total is None else total
     # Create a progress bar
     with Progress(
         TextColumn(
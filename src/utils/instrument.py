@@ -0,0 +1,218 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import atexit
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from src.settings import ProjectPath
+from src.utils.imports import *
+
+# `1` times every stage; `memory` also traces the memory allocated by each one
+ENVIRONMENT_VARIABLE: str = "INSTRUMENT"
+
+_STATE: dict[str, bool] = {
+    "enabled": os.environ.get(ENVIRONMENT_VARIABLE, "0") not in ("", "0"),
+    "memory": os.environ.get(ENVIRONMENT_VARIABLE) == "memory",
+}
+# Finished stages of this process and the stages currently open
+_RECORDS: list[Info] = []
+_STACK: list["Stage"] = []
+
+
+class _Off(object):
+    """Stand-in returned by `stage` when instrumentation is off."""
+
+    rows: Optional[int] = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> bool:
+        return False
+
+
+_OFF = _Off()
+
+
+@dataclass
+class Stage(object):
+    """Timer (and memory tracer) of one pipeline stage; set `rows` inside the block."""
+
+    name: str
+    variable: str
+    rows: Optional[int] = None
+
+    def __enter__(self) -> Self:
+        _STACK.append(self)
+        self._memory: int = (
+            tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        )
+        self._start: float = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> bool:
+        seconds: float = time.perf_counter() - self._start
+        _STACK.pop()
+        _RECORDS.append(
+            {
+                "variable": self.variable,
+                "stage": self.name,
+                "seconds": seconds,
+                "rows": self.rows,
+                "memory": (
+                    tracemalloc.get_traced_memory()[0] - self._memory
+                    if tracemalloc.is_tracing()
+                    else None
+                ),
+            }
+        )
+        return False
+
+
+def stage(name: str, variable: Optional[str] = None) -> Stage | _Off:
+    """Context manager timing a stage, attributed to `variable`.
+
+    Stages without a variable inherit the one of the enclosing stage. When
+    instrumentation is off this returns a shared no-op, so leaving the calls
+    in the hot paths costs a function call and a dictionary lookup.
+    """
+    if not _STATE["enabled"]:
+        return _OFF
+    if variable is None:
+        variable = _STACK[-1].variable if _STACK else "-"
+    return Stage(name=name, variable=variable)
+
+
+def enabled() -> bool:
+    return _STATE["enabled"]
+
+
+def tracing() -> bool:
+    """Whether stages also record memory deltas."""
+    return _STATE["memory"]
+
+
+@contextmanager
+def instrument(memory: bool = False):
+    """Instrument the stages run inside the block (and in `parallel_map` workers).
+
+    >>> with instrument():
+    ...     run(variables=["Real GDP"])
+    >>> print_report()
+    """
+    previous: dict[str, bool] = dict(_STATE)
+    tracing: bool = memory and not tracemalloc.is_tracing()
+    _STATE.update(enabled=True, memory=memory or previous["memory"])
+    if tracing:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        _STATE.update(previous)
+        if tracing:
+            tracemalloc.stop()
+
+
+def run_instrumented(
+    func: Callable[[Any], Any], item: Any, memory: bool = False
+) -> tuple[Any, list[Info]]:
+    """Run `func(item)` instrumented in a worker and return its stages with it."""
+    # A forked worker inherits the records of its parent: keep only new ones
+    start: int = len(_RECORDS)
+    with instrument(memory=memory):
+        result: Any = func(item)
+    records: list[Info] = _RECORDS[start:]
+    del _RECORDS[start:]
+    return result, records
+
+
+def collect(records: list[Info]) -> None:
+    """Add the stages recorded in another process."""
+    _RECORDS.extend(records)
+
+
+def report(records: Optional[list[Info]] = None) -> DataFrame:
+    """Calls, total seconds, rows and memory of every stage of every variable.
+
+    Times of nested stages are inclusive (`fire.construct` contains `fire.filter_id`).
+    """
+    df: DataFrame = pd.DataFrame(
+        _RECORDS if records is None else records,
+        columns=["variable", "stage", "seconds", "rows", "memory"],
+    )
+    return (
+        df.groupby(["variable", "stage"], sort=False)
+        .agg(
+            calls=("seconds", "size"),
+            seconds=("seconds", "sum"),
+            rows=("rows", lambda rows: rows.sum(min_count=1)),
+            memory=("memory", lambda memory: memory.sum(min_count=1)),
+        )
+        .astype({"rows": "Int64", "memory": "Int64"})
+        .reset_index()
+    )
+
+
+def print_report(records: Optional[list[Info]] = None) -> None:
+    """Print the per-variable report as a rich table."""
+    from rich import print as ic
+    from rich.table import Table
+
+    table = Table(title="Stages")
+    for column in ("variable", "stage", "calls", "seconds", "rows", "memory (MB)"):
+        table.add_column(
+            column, justify="left" if column in ("variable", "stage") else "right"
+        )
+    for row in report(records=records).itertuples(index=False):
+        table.add_row(
+            row.variable,
+            row.stage,
+            f"{row.calls}",
+            f"{row.seconds:.4f}",
+            "" if pd.isna(row.rows) else f"{int(row.rows):,}",
+            "" if pd.isna(row.memory) else f"{row.memory / 2**20:.1f}",
+        )
+    ic(table)
+
+
+def save_report(
+    path: Optional[str] = None, records: Optional[list[Info]] = None
+) -> str:
+    """Save the per-variable report as JSON (`cache/instrument/report.json` by default)."""
+    path = f"{ProjectPath.cache}/instrument/report.json" if path is None else path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df: DataFrame = report(records=records)
+    with open(path, "w") as file:
+        json.dump(
+            {
+                variable: group.drop(columns="variable")
+                .astype(object)
+                .where(group.drop(columns="variable").notna(), None)
+                .to_dict(orient="records")
+                for variable, group in df.groupby("variable", sort=False)
+            },
+            file,
+            indent=2,
+        )
+    return path
+
+
+def _report_at_exit() -> None:
+    if _RECORDS:
+        print_report()
+        pp(f"Instrumentation report saved to {save_report()}")
+
+
+if _STATE["enabled"]:
+    # Enabled from the environment: report once the main process is done
+    if _STATE["memory"]:
+        tracemalloc.start()
+    atexit.register(_report_at_exit)
+
+
+if __name__ == "__main__":
+    ...
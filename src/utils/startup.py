@@ -0,0 +1,118 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import os
+import subprocess
+from typing import Optional
+
+# Import budget (seconds) of the modules loaded by every worker process; the
+# floor is pandas and NumPy, which every worker needs
+BUDGET: dict[str, float] = {
+    "src.settings": 0.05,
+    "src.constants": 0.05,
+    "src.utils.imports": 0.75,
+    "src.reg.weight": 0.75,
+    "src.reg.pipeline": 0.75,
+    "src.reg.sweep": 0.75,
+}
+# Budget (seconds) for a pool worker to start and run its first task, once the
+# parent has imported the modules of the sweep
+WORKER_BUDGET: float = 0.1
+# Heavy dependencies that must only load on the paths that use them
+LAZY: tuple[str, ...] = ("matplotlib", "statsmodels", "rich")
+# Timings vary across machines, so the budgets are only enforced when this is
+# set, to the factor they are scaled by (`1`, or `3` on a slow machine)
+ENVIRONMENT_VARIABLE: str = "STARTUP_BUDGET"
+
+
+def budget_factor() -> Optional[float]:
+    """Factor of the budgets from the environment (`None`: report timings only)."""
+    value: str = os.environ.get(ENVIRONMENT_VARIABLE, "")
+    return float(value) if value not in ("", "0") else None
+
+
+def python(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Run `code` in a fresh interpreter from the project root."""
+    return subprocess.run(
+        [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path.cwd(),
+    )
+
+
+def import_profile(module: str) -> tuple[float, list[str]]:
+    """Import `module` in a fresh interpreter and report its cumulative import
+    time (from `-X importtime`) and which `LAZY` packages it pulled in."""
+    result = python(
+        code=f"import sys; import {module}; "
+        f"print(*sorted({{name.split('.')[0] for name in sys.modules}} & {set(LAZY)}))",
+        importtime=True,
+    )
+    for line in result.stderr.splitlines()[::-1]:
+        # import time: self [us] | cumulative | imported package
+        fields: list[str] = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            # Header, warnings and other stderr output
+            continue
+        if fields[2].strip() == module:
+            return int(fields[1]) / 1e6, result.stdout.split()
+    raise RuntimeError(f"{module} not found in the import profile")
+
+
+def worker_startup(module: str = "src.reg.sweep") -> float:
+    """Seconds for a `parallel_map` pool to start a worker and run a no-op in it,
+    after importing `module` in a fresh interpreter."""
+    result = python(
+        code=f"import time; import {module}; "
+        "from concurrent.futures import ProcessPoolExecutor; "
+        "start = time.perf_counter(); "
+        "executor = ProcessPoolExecutor(max_workers=1); "
+        "executor.submit(int).result(); "
+        "print(time.perf_counter() - start); "
+        "executor.shutdown()"
+    )
+    return float(result.stdout)
+
+
+def check_startup(
+    budget: dict[str, float] = BUDGET,
+    worker_budget: float = WORKER_BUDGET,
+    factor: Optional[float] = None,
+) -> None:
+    """Report the import time of every module and the startup of a worker.
+
+    Asserts that no module pulls in a `LAZY` package and, when `factor` is
+    given, that every timing stays within `factor` times its budget.
+    """
+    failures: list[str] = []
+    for module, limit in budget.items():
+        seconds, loaded = import_profile(module=module)
+        limit *= factor or 1
+        passed: bool = not loaded and (factor is None or seconds <= limit)
+        line: str = (
+            f"{'ok' if passed else 'FAIL':>4}  {module:<20} {seconds * 1e3:8.1f} ms"
+            f" (budget {limit * 1e3:.0f} ms)"
+            + (f"  loads {', '.join(loaded)}" if loaded else "")
+        )
+        print(line)
+        if not passed:
+            failures.append(line)
+    seconds = worker_startup()
+    worker_budget *= factor or 1
+    passed = factor is None or seconds <= worker_budget
+    line = (
+        f"{'ok' if passed else 'FAIL':>4}  {'worker':<20}"
+        f" {seconds * 1e3:8.1f} ms (budget {worker_budget * 1e3:.0f} ms)"
+    )
+    print(line)
+    if not passed:
+        failures.append(line)
+    assert not failures, "Startup check failed:\n" + "\n".join(failures)
+
+
+if __name__ == "__main__":
+    check_startup(factor=budget_factor())
@@ -4,6 +4,81 @@ from pathlib import Path
 sys.path.append(str(object=Path.cwd()))
 from src.utils.imports import *
 
+# Objects shared across the process: key -> (source file stamps, object)
+_FILE_CACHE: dict[Any, tuple[tuple[tuple[str, int], ...], Any]] = {}
+
+
+def cached_on_files(
+    key: Any,
+    paths: Sequence[str],
+    loader: Callable[[], Any],
+    cache: Optional[dict] = None,
+    maxsize: Optional[int] = None,
+) -> Any:
+    """Call `loader` once per process and share its result.
+
+    The result is reloaded automatically when the modification time of any
+    of the source `paths` changes. Cached frames are shared by every caller
+    and must be treated as read-only. Pass a dedicated `cache` with `maxsize`
+    to keep only the most recently used entries.
+    """
+    cache = _FILE_CACHE if cache is None else cache
+    stamps: tuple[tuple[str, int], ...] = tuple(
+        (os.path.abspath(path), os.stat(path).st_mtime_ns) for path in paths
+    )
+    cached = cache.pop(key, None)
+    if cached is not None and cached[0] == stamps:
+        # Reinsert so that the least recently used entry comes first
+        cache[key] = cached
+        return cached[1]
+    result: Any = loader()
+    cache[key] = (stamps, result)
+    while maxsize is not None and len(cache) > maxsize:
+        del cache[next(iter(cache))]
+    return result
+
+
+def parallel_map(
+    func: Callable[..., Any],
+    items: Sequence[Any],
+    workers: Optional[int] = None,
+    description: str = "Working",
+) -> list[Any]:
+    """Apply `func` to every item across processes, keeping the order of `items`.
+
+    One progress bar in this process advances as workers finish. `workers=1`
+    runs everything here without a process pool.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from functools import partial
+
+    from src.utils import instrument
+
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return [func(item) for item in progress(items, description=description)]
+    if instrument.enabled():
+        # Workers send their stages back with their results
+        task: Callable[..., Any] = partial(
+            instrument.run_instrumented,
+            func,
+            memory=instrument.tracing(),
+        )
+    else:
+        task = func
+    results: dict[int, Any] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(task, item): i for i, item in enumerate(items)}
+        for future in progress(
+            as_completed(futures), description=description, total=len(futures)
+        ):
+            results[futures[future]] = future.result()
+    if instrument.enabled():
+        for i in range(len(items)):
+            results[i], records = results[i]
+            instrument.collect(records=records)
+    return [results[i] for i in range(len(items))]
+
 
 def quantile_25(x) -> float:
     """Calculate the 25th percentile of the data."""
@@ -15,8 +90,82 @@ def quantile_75(x) -> float:
     return np.quantile(x, 0.75)
 
 
+def period_ordinals(period: Series | Index, freq: str = "Q") -> np.ndarray:
+    """Integer ordinals of a `period` column, whether it holds `Period` objects or ordinals."""
+    if isinstance(period.dtype, pd.PeriodDtype):
+        return np.asarray(period.array.asi8, dtype=np.int64)
+    if period.dtype.kind in "iu":
+        return np.asarray(period, dtype=np.int64)
+    return pd.PeriodIndex(period, freq=freq).asi8
+
+
+def ordinals_to_period(ordinals: np.ndarray, freq: str = "Q") -> PeriodIndex:
+    """Convert integer ordinals back to a `PeriodIndex` (for output only)."""
+    return pd.PeriodIndex.from_ordinals(ordinals=ordinals, freq=freq)
+
+
+def with_periods(df: DataFrame, column: str = "period") -> DataFrame:
+    """Copy of `df` with the ordinals in `column` converted to `Period` (for output only)."""
+    return df.assign(**{column: ordinals_to_period(df[column].to_numpy())})
+
+
+def parse_periods(labels: Iterable[str]) -> PeriodIndex:
+    """Parse labels such as `1968Q4` or `1968-11` with one vectorized constructor."""
+    labels = pd.Index(labels).astype(str)
+    freq: str = "Q" if labels.str.contains("Q").any() else "M"
+    return pd.PeriodIndex(labels, freq=freq)
+
+
+def quarter_ordinals(year: np.ndarray, quarter: np.ndarray) -> np.ndarray:
+    """Ordinals of quarterly periods (`1970Q1` is 0)."""
+    return (np.asarray(year, dtype=np.int64) - 1970) * 4 + np.asarray(quarter) - 1
+
+
+def last_month_ordinals(quarters: np.ndarray) -> np.ndarray:
+    """Ordinal of the last month of each quarter (`1970-01` is 0)."""
+    return np.asarray(quarters, dtype=np.int64) * 3 + 2
+
+
+def month_to_quarter(months: np.ndarray) -> np.ndarray:
+    """Ordinal of the quarter containing each monthly ordinal."""
+    return np.asarray(months, dtype=np.int64) // 3
+
+
+def month_ordinals(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """Ordinals of monthly periods (`1970-01` is 0)."""
+    return (np.asarray(year, dtype=np.int64) - 1970) * 12 + np.asarray(month) - 1
+
+
+def date_quarters(dates: Iterable) -> np.ndarray:
+    """Quarter ordinals of daily or monthly dates (strings or datetimes)."""
+    months: np.ndarray = (
+        pd.to_datetime(pd.Index(dates)).to_numpy().astype("datetime64[M]")
+    )
+    return month_to_quarter(months.astype(np.int64))
+
+
+def quarterly_mean(df: DataFrame, quarters: np.ndarray, shift: int = 0) -> DataFrame:
+    """Means of daily or monthly rows per quarter, indexed by quarter ordinals.
+
+    `quarters` holds the quarter ordinal of every row (`date_quarters`).
+    With `shift`, quarter t takes the mean of quarter t - `shift` and the
+    quarters left without one are dropped (`shift=-3` gives x_{t+3} at t).
+    """
+    df = df.groupby(by=np.asarray(quarters, dtype=np.int64), sort=True).mean()
+    df.index.name = "period"
+    return df.shift(periods=shift).dropna() if shift else df
+
+
+def row_counts(values: np.ndarray) -> np.ndarray:
+    """Number of rows sharing the value of every row (`value_counts` mapped back)."""
+    inverse, counts = np.unique(values, return_inverse=True, return_counts=True)[1:]
+    return counts[inverse]
+
+
 def revision_coefficient(df: DataFrame, summary: bool = False) -> float:
     """Calculate the revision coefficient."""
+    import statsmodels.api as sm
+
     model = sm.OLS(endog=df["error"], exog=sm.add_constant(df["revision"])).fit()
     if summary:
         pp(model.summary())
@@ -0,0 +1,176 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from src.bench.synthetic import generate
+from src.reg.fire import Fire
+from src.reg.incremental import rebuild, update
+from src.reg.regime import panel_regimes
+from src.reg.rolling import (
+    LEVELS,
+    level_moments,
+    newey_west_lags,
+    window_beta,
+    window_inference,
+)
+from src.reg.weight import WindowGenerator, streaming_beta
+from src.settings import ProjectPath
+
+COLUMN: str = "Real GDP"
+# Short windows, so that the synthetic panel has many of them
+WINDOW: int = 20
+
+
+@pytest.fixture(scope="module")
+def root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Synthetic raw files under a temporary working directory."""
+    root: Path = tmp_path_factory.mktemp("synthetic")
+    generate(root=str(root))
+    for directory in (
+        ProjectPath.consensus_reg,
+        ProjectPath.individual_reg,
+        ProjectPath.beta_reg,
+    ):
+        (root / directory).mkdir(parents=True)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(root)
+        yield root
+
+
+@pytest.fixture(scope="module")
+def panel(root: Path) -> pd.DataFrame:
+    return Fire(column=COLUMN).df
+
+
+def level_rows(df: pd.DataFrame, level: str) -> pd.DataFrame:
+    """Observations of the regression at `level`: one per quarter for the consensus."""
+    if level == "consensus":
+        df = df.drop_duplicates(subset="period")
+    return df.sort_values(by=["period", "id"])
+
+
+def test_window_beta(panel: pd.DataFrame) -> None:
+    df_beta: pd.DataFrame = window_beta(
+        moments=level_moments(df=panel), window_size=WINDOW
+    )
+    expected: pd.DataFrame = pd.DataFrame(
+        [window.get_beta() for window in WindowGenerator(df=panel, window_size=WINDOW)]
+    ).set_index("period")
+    np.testing.assert_array_equal(df_beta.index, expected.index)
+    np.testing.assert_allclose(df_beta[list(LEVELS)], expected[list(LEVELS)])
+
+
+def test_streaming_beta(panel: pd.DataFrame) -> None:
+    df_beta: pd.DataFrame = window_beta(
+        moments=level_moments(df=panel), window_size=WINDOW
+    )
+    df_streaming: pd.DataFrame = streaming_beta(df=panel, window_size=WINDOW)
+    np.testing.assert_array_equal(df_streaming.index, df_beta.index)
+    np.testing.assert_allclose(df_streaming.to_numpy(dtype=float), df_beta)
+
+
+@pytest.mark.parametrize("window", [0, 97, -1])
+@pytest.mark.parametrize("level", list(LEVELS))
+def test_window_inference(panel: pd.DataFrame, window: int, level: str) -> None:
+    moments = level_moments(df=panel)
+    lags: int = newey_west_lags(window_size=WINDOW)
+    row: pd.Series = window_inference(
+        df=panel, window_size=WINDOW, moments=moments
+    ).iloc[window]
+    # First quarter of the window
+    first: int = moments["individual"].start + window % (
+        moments["individual"].periods - WINDOW
+    )
+    df: pd.DataFrame = level_rows(
+        df=panel[panel["period"].between(first, first + WINDOW - 1)], level=level
+    )
+    x_column, y_column = LEVELS[level]
+    model = sm.OLS(df[y_column].to_numpy(), sm.add_constant(df[x_column].to_numpy()))
+    # Consensus: one row per quarter, clustered by quarter and plain Newey–West;
+    # forecasters: clustered by id and Driscoll–Kraay over the quarters
+    groups: np.ndarray = np.unique(
+        df["period" if level == "consensus" else "id"], return_inverse=True
+    )[1]
+    hac = (
+        model.fit(cov_type="HAC", cov_kwds={"maxlags": lags})
+        if level == "consensus"
+        else model.fit(
+            cov_type="hac-groupsum",
+            cov_kwds={"time": (df["period"] - first).to_numpy(), "maxlags": lags},
+        )
+    )
+    np.testing.assert_allclose(
+        row[[f"{level}_se", f"{level}_cluster_se", f"{level}_hac_se"]].to_numpy(
+            dtype=float
+        ),
+        [
+            model.fit().bse[1],
+            model.fit(cov_type="cluster", cov_kwds={"groups": groups}).bse[1],
+            hac.bse[1],
+        ],
+    )
+
+
+def test_regime_beta(panel: pd.DataFrame) -> None:
+    df_regime: pd.DataFrame = panel_regimes(df=panel, breaks=["2000Q1"])
+    before: np.ndarray = panel["period"].to_numpy() < pd.Period("2000Q1").ordinal
+    for regime, mask in [("before 2000Q1", before), ("from 2000Q1", ~before)]:
+        for level, (x_column, y_column) in LEVELS.items():
+            df: pd.DataFrame = level_rows(df=panel[mask], level=level)
+            fit = sm.OLS(
+                df[y_column].to_numpy(), sm.add_constant(df[x_column].to_numpy())
+            ).fit()
+            assert df_regime.loc[regime, level] == pytest.approx(fit.params[1])
+        assert df_regime.loc[regime, "observations"] == mask.sum()
+        assert df_regime.loc[regime, "quarters"] == panel[mask]["period"].nunique()
+
+
+def test_update(root: Path) -> None:
+    """Appending the last quarters writes what a full rebuild writes."""
+    path: Path = root / ProjectPath.survey / f"{COLUMN}.csv"
+    original: str = path.read_text()
+    survey: pd.DataFrame = pd.read_csv(path)
+    quarter: pd.PeriodIndex = pd.PeriodIndex(survey["period"], freq="Q")
+    cutoff: pd.Period = quarter.max() - 4
+    # Forecasters answering after the cutoff already pass `filter_id` before
+    # it, so the appended quarters leave the persisted rows unchanged
+    answers: pd.Series = survey[quarter <= cutoff].groupby("id").size()
+    late: np.ndarray = survey.loc[quarter > cutoff, "id"].unique()
+    stable: pd.DataFrame = survey[
+        ~survey["id"].isin(late) | survey["id"].map(answers).ge(30)
+    ]
+    outputs: list[Path] = [
+        root / directory / "RGDP.csv"
+        for directory in (
+            ProjectPath.consensus_reg,
+            ProjectPath.individual_reg,
+            ProjectPath.beta_reg,
+        )
+    ]
+    try:
+        stable[pd.PeriodIndex(stable["period"], freq="Q") <= cutoff].to_csv(
+            path, index=False
+        )
+        update(column=COLUMN, window_size=WINDOW, verbose=False)
+        stable.to_csv(path, index=False)
+        appended: pd.DataFrame = update(
+            column=COLUMN, window_size=WINDOW, verbose=False
+        )
+        assert 0 < len(appended) <= 4
+        incremental: list[pd.DataFrame] = [pd.read_csv(output) for output in outputs]
+        rebuild(fire=Fire(column=COLUMN), window_size=WINDOW, verbose=False)
+        for df, output in zip(incremental, outputs):
+            expected: pd.DataFrame = pd.read_csv(output)
+            assert list(df.columns) == list(expected.columns)
+            keys: list[str] = [column for column in ("period", "id") if column in df]
+            df = df.sort_values(by=keys, kind="stable", ignore_index=True)
+            expected = expected.sort_values(by=keys, kind="stable", ignore_index=True)
+            pd.testing.assert_frame_equal(df, expected, rtol=1e-6)
+    finally:
+        path.write_text(original)
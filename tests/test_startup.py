@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path.cwd()))
+
+import pytest
+
+from src.utils.startup import (
+    BUDGET,
+    ENVIRONMENT_VARIABLE,
+    WORKER_BUDGET,
+    budget_factor,
+    import_profile,
+    worker_startup,
+)
+
+FACTOR = budget_factor()
+# Timings depend on the machine: only enforced on request
+timed = pytest.mark.skipif(
+    FACTOR is None, reason=f"set {ENVIRONMENT_VARIABLE} to enforce the budgets"
+)
+
+
+@pytest.mark.parametrize("module", list(BUDGET))
+def test_lazy_imports(module: str, record_property) -> None:
+    seconds, loaded = import_profile(module=module)
+    record_property("seconds", seconds)
+    assert not loaded, f"{module} loads {loaded}"
+
+
+@timed
+@pytest.mark.parametrize("module", list(BUDGET))
+def test_import_budget(module: str) -> None:
+    seconds, _ = import_profile(module=module)
+    assert seconds <= FACTOR * BUDGET[module], f"{module} imports in {seconds:.3f} s"
+
+
+@timed
+def test_worker_startup() -> None:
+    seconds: float = worker_startup()
+    assert seconds <= FACTOR * WORKER_BUDGET, f"A worker starts in {seconds:.3f} s"